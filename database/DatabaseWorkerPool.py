@@ -0,0 +1,117 @@
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from utils.Logger import Logger
+from utils.Metrics import Metrics
+
+# Pool owning the current thread, if it's one of the workers.
+WORKER_THREAD = threading.local()
+
+
+# Fixed amount of threads running queries for one database. Work is queued and handed back as a
+# concurrent.futures.Future, so callers don't block (or open yet another connection) while the database is busy.
+class DatabaseWorkerPool(object):
+    def __init__(self, name, workers, engine):
+        self.name = name
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'{name}DbWorker')
+        self.lock = threading.Lock()
+        self.pending = 0  # Submitted and not finished yet.
+        self.connections_in_use = 0
+        self.blocking_functions = set()  # Names of the functions that blocked a caller, warned about once.
+
+        event.listen(engine, 'checkout', self.on_connection_checkout)
+        event.listen(engine, 'checkin', self.on_connection_checkin)
+
+    def submit(self, function, *args, **kwargs):
+        with self.lock:
+            self.pending += 1
+            pending = self.pending
+        Metrics.set(f'db.{self.name}.pending', pending)
+        if pending > self.workers:
+            # Every worker is busy, this one waits in the queue.
+            Metrics.increment(f'db.{self.name}.saturated')
+        return self.executor.submit(self._run, time.perf_counter(), function, args, kwargs)
+
+    # Runs function on this pool and waits for its result. Already on a worker of any pool it runs right away instead,
+    # a worker waiting on another pool (which might be waiting on this one) could otherwise deadlock.
+    def run(self, function, *args, **kwargs):
+        if getattr(WORKER_THREAD, 'pool', None):
+            return function(*args, **kwargs)
+
+        # The caller (e.g. the world loop) is blocked until done, it should submit and defer instead.
+        Metrics.increment(f'db.{self.name}.blocking_calls')
+        if function.__name__ not in self.blocking_functions:
+            self.blocking_functions.add(function.__name__)
+            Logger.warning(f'{function.__name__} blocked {threading.current_thread().name} waiting for the '
+                           f'{self.name} database workers.')
+        start_time = time.perf_counter()
+        try:
+            return self.submit(function, *args, **kwargs).result()
+        finally:
+            Metrics.add_sample(f'db.{self.name}.blocking_ms', (time.perf_counter() - start_time) * 1000)
+
+    # Makes every static method of cls opening a session (referencing session_holder_name) run on this pool, so
+    # runtime queries are bounded by its workers wherever they are called from.
+    def route(self, cls, session_holder_name='SessionHolder'):
+        for name, attribute in list(vars(cls).items()):
+            if isinstance(attribute, staticmethod) and session_holder_name in attribute.__func__.__code__.co_names:
+                setattr(cls, name, staticmethod(self._routed(attribute.__func__)))
+
+    def _routed(self, function):
+        @functools.wraps(function)
+        def routed(*args, **kwargs):
+            return self.run(function, *args, **kwargs)
+        return routed
+
+    def _run(self, submit_time, function, args, kwargs):
+        WORKER_THREAD.pool = self
+        start_time = time.perf_counter()
+        Metrics.add_sample(f'db.{self.name}.queue_wait_ms', (start_time - submit_time) * 1000)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            Metrics.add_sample(f'db.{self.name}.query_ms', (time.perf_counter() - start_time) * 1000)
+            with self.lock:
+                self.pending -= 1
+                pending = self.pending
+            Metrics.set(f'db.{self.name}.pending', pending)
+
+    def on_connection_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self.lock:
+            self.connections_in_use += 1
+            in_use = self.connections_in_use
+        Metrics.set(f'db.{self.name}.connections_in_use', in_use)
+
+    def on_connection_checkin(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connections_in_use -= 1
+            in_use = self.connections_in_use
+        Metrics.set(f'db.{self.name}.connections_in_use', in_use)
+
+
+# Future of {name: result} done once every one of the given {name: future} is, without blocking a thread waiting.
+def gather(futures):
+    gathered = Future()
+    lock = threading.Lock()
+    remaining = [len(futures)]
+
+    def on_done(future):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        try:
+            gathered.set_result({name: future.result() for name, future in futures.items()})
+        except Exception as exception:
+            gathered.set_exception(exception)
+
+    if not futures:
+        gathered.set_result({})
+    for future in futures.values():
+        future.add_done_callback(on_done)
+    return gathered
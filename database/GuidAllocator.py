@@ -0,0 +1,24 @@
+import threading
+
+from utils.Metrics import Metrics
+
+
+# Hands out guids from memory so new rows don't need an insert round trip to get their auto increment id. The world
+# server is the only one creating these rows, so everything above the highest guid in the table at first use is ours.
+class GuidAllocator(object):
+    def __init__(self, name, max_guid_loader):
+        self.name = name
+        self.max_guid_loader = max_guid_loader
+        self.next_guid = 0
+        self.lock = threading.Lock()
+
+    def allocate(self):
+        # Queried without holding the lock, the query might have to wait for a worker that wants it.
+        max_guid = self.max_guid_loader() if not self.next_guid else 0
+        with self.lock:
+            if not self.next_guid:
+                self.next_guid = (max_guid or 0) + 1
+            guid = self.next_guid
+            self.next_guid += 1
+        Metrics.increment(f'guids.{self.name}.allocated')
+        return guid
@@ -0,0 +1,26 @@
+from collections import namedtuple
+
+from sqlalchemy import inspect
+
+# Rows fetched per round trip when streaming records.
+STREAM_BATCH_SIZE = 1000
+
+
+# Builds an immutable record class with just the wanted columns of a model, used instead of full ORM instances for
+# read only data kept in memory for the whole server lifetime (no identity map, instance state or per row __dict__).
+# Its COLUMNS can be queried directly and each row turned into a record with Record._make(row).
+def record_type(name, model, module, column_filter=None):
+    column_attributes = [attribute for attribute in inspect(model).column_attrs
+                         if not column_filter or column_filter(attribute.key)]
+    record = namedtuple(name, [attribute.key for attribute in column_attributes], module=module)
+    record.COLUMNS = [attribute.columns[0] for attribute in column_attributes]
+    return record
+
+
+# Yields records of the query rows in batches, closing the session once done.
+def stream_records(db_session, query, record):
+    try:
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            yield record._make(row)
+    finally:
+        db_session.close()
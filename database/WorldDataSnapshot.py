@@ -0,0 +1,112 @@
+import hashlib
+import os
+import pickle
+import struct
+import time
+import traceback
+
+from database.dbc.DbcDatabaseManager import DbcDatabaseManager, DBC_STORES
+from database.dbc.DbcModels import CharBaseInfo, Faction, FactionTemplate, SkillLine, SkillLineAbility, Spell, \
+    TaxiNode, TaxiPathNode
+from database.world.WorldDatabaseManager import WorldDatabaseManager
+from database.world.WorldModels import CreatureLootTemplate, ItemTemplate, QuestTemplate, Worldports, \
+    t_creature_quest_finisher, t_creature_quest_starter
+from utils.ConfigManager import config
+from utils.Logger import Logger
+from utils.PathManager import PathManager
+
+SNAPSHOT_MAGIC = b'ACWD'
+# Bump whenever the holders below or the way they are filled change.
+SNAPSHOT_FORMAT_VERSION = 4
+HEADER_FORMAT = '<4sI32s'
+
+WORLD_HOLDERS = [
+    (WorldDatabaseManager.ItemTemplateHolder, ['ITEM_TEMPLATES', 'ITEM_TEMPLATES_BY_NAME']),
+    (WorldDatabaseManager.WorldportHolder, ['WORLDPORTS_BY_NAME']),
+    (WorldDatabaseManager.QuestTemplateHolder, ['QUEST_TEMPLATES']),
+    (WorldDatabaseManager.CreatureLootTemplateHolder, ['CREATURE_LOOT_TEMPLATES']),
+    (WorldDatabaseManager.QuestRelationHolder, ['QUEST_RELATION', 'QUEST_INVOLVEMENT'])
+]
+WORLD_TABLES = [ItemTemplate.__tablename__, QuestTemplate.__tablename__, CreatureLootTemplate.__tablename__,
+                t_creature_quest_starter.name, t_creature_quest_finisher.name, Worldports.__tablename__]
+
+DBC_HOLDERS = [
+    (DbcDatabaseManager.SpellHolder, ['SPELLS', 'SPELLS_BY_NAME']),
+    (DbcDatabaseManager.SkillHolder, ['SKILLS', 'SKILLS_BY_NAME']),
+    (DbcDatabaseManager.SkillLineAbilityHolder, ['SKILL_LINE_ABILITIES']),
+    (DbcDatabaseManager.CharBaseInfoHolder, ['BASE_INFOS']),
+    (DbcDatabaseManager.TaxiNodesHolder, ['EASTERN_KINGDOMS_TAXI_NODES', 'KALIMDOR_TAXI_NODES']),
+    (DbcDatabaseManager.TaxiPathNodesHolder, ['TAXI_PATH_NODES']),
+    (DbcDatabaseManager.FactionHolder, ['FACTIONS']),
+    (DbcDatabaseManager.FactionTemplateHolder, ['FACTION_TEMPLATES']),
+    (DbcDatabaseManager.DbcStoreHolder, ['STORES'])
+]
+DBC_TABLES = [Spell.__tablename__, SkillLine.__tablename__, SkillLineAbility.__tablename__,
+              CharBaseInfo.__tablename__, TaxiNode.__tablename__, TaxiPathNode.__tablename__, Faction.__tablename__,
+              FactionTemplate.__tablename__] + \
+    sorted({model.__tablename__ for model, key_getter, unique in DBC_STORES.values()} - {SkillLineAbility.__tablename__})
+
+
+# On disk copy of the world and DBC data holders. The file starts with a fixed size header holding a digest of the
+# applied world updates and the checksums of every source table, the holders follow as a single pickle, so a warm
+# start is one file read instead of building every row through the ORM.
+class WorldDataSnapshot:
+
+    @staticmethod
+    def get_version():
+        digest = hashlib.sha256()
+        digest.update(str(SNAPSHOT_FORMAT_VERSION).encode())
+        # Loot templates and quest relations are only loaded along with creatures.
+        digest.update(str(config.Server.Settings.load_creatures).encode())
+        for update_id in WorldDatabaseManager.applied_updates_get_all_ids():
+            digest.update(update_id.encode())
+        for table_name, checksum in WorldDatabaseManager.table_checksums(WORLD_TABLES) + \
+                DbcDatabaseManager.table_checksums(DBC_TABLES):
+            digest.update(f'{table_name}:{checksum}'.encode())
+        return digest.digest()
+
+    # Fills the holders from the snapshot, returns False if there's none or it's outdated.
+    @staticmethod
+    def load(version):
+        file_path = PathManager.get_world_data_snapshot_file_path()
+        if not os.path.isfile(file_path):
+            return False
+
+        start_time = time.time()
+        try:
+            with open(file_path, 'rb') as snapshot_file:
+                header = snapshot_file.read(struct.calcsize(HEADER_FORMAT))
+                magic, format_version, snapshot_version = struct.unpack(HEADER_FORMAT, header)
+                if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION or snapshot_version != version:
+                    Logger.info('World data snapshot is outdated, it will be rebuilt.')
+                    return False
+                holders_data = pickle.load(snapshot_file)
+        except Exception:
+            Logger.warning(f'Unable to read the world data snapshot, it will be rebuilt: {traceback.format_exc()}')
+            return False
+
+        for holder, attributes in WORLD_HOLDERS + DBC_HOLDERS:
+            for attribute in attributes:
+                setattr(holder, attribute, holders_data[f'{holder.__name__}.{attribute}'])
+
+        Logger.success(f'Loaded world data snapshot in {time.time() - start_time:.2f}s.')
+        return True
+
+    @staticmethod
+    def save(version):
+        holders_data = {}
+        for holder, attributes in WORLD_HOLDERS + DBC_HOLDERS:
+            for attribute in attributes:
+                holders_data[f'{holder.__name__}.{attribute}'] = getattr(holder, attribute)
+
+        file_path = PathManager.get_world_data_snapshot_file_path()
+        temp_file_path = f'{file_path}.tmp'
+        try:
+            os.makedirs(PathManager.get_cache_path(), exist_ok=True)
+            with open(temp_file_path, 'wb') as snapshot_file:
+                snapshot_file.write(struct.pack(HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, version))
+                pickle.dump(holders_data, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            # Replace it only once fully written, a crash mid write leaves the previous snapshot intact.
+            os.replace(temp_file_path, file_path)
+        except Exception:
+            Logger.warning(f'Unable to write the world data snapshot: {traceback.format_exc()}')
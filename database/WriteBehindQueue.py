@@ -0,0 +1,160 @@
+import threading
+import time
+import traceback
+
+from sqlalchemy import inspect
+
+from utils.ConfigManager import config
+from utils.Logger import Logger
+from utils.Metrics import Metrics
+
+INSERT = 0
+MERGE = 1
+DELETE = 2
+
+
+# Queues row writes and flushes them in batches from its own thread. Writes to the same row (same primary key) are
+# coalesced, only the last operation is done, with the row values it has at flush time. A row inserted and deleted
+# before being flushed is never written at all. owner_of(instance) tells which owner (e.g. character) a row belongs to,
+# so the rows of a single owner can be flushed on their own.
+class WriteBehindQueue(object):
+    def __init__(self, session_holder, name, owner_of=None):
+        self.session_holder = session_holder
+        self.name = name
+        self.owner_of = owner_of
+        self.pending = {}  # (model, primary key): (operation, instance), in queue order
+        self.dead_letters = []  # (operation, instance) that couldn't be written, kept for inspection.
+        self.condition = threading.Condition()
+        self.flushing = False
+        self.running = False
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        worker_thread = threading.Thread(target=self.run, name=f'{self.name}WriteBehind')
+        worker_thread.daemon = True
+        worker_thread.start()
+
+    # New rows, which might still be dropped if deleted before the flush.
+    def insert(self, instance):
+        self._queue(INSERT, instance)
+
+    def merge(self, instance):
+        self._queue(MERGE, instance)
+
+    def delete(self, instance):
+        self._queue(DELETE, instance)
+
+    def _queue(self, operation, instance):
+        key = (type(instance), inspect(instance).mapper.primary_key_from_instance(instance))
+        with self.condition:
+            if key in self.pending:
+                # Move it to the end so it's written after anything queued before this change.
+                queued_operation, queued_instance = self.pending.pop(key)
+                Metrics.increment(f'write_behind.{self.name}.coalesced')
+                if queued_operation == INSERT:
+                    if operation == DELETE:
+                        # Never reached the database, nothing to write.
+                        return
+                    operation = INSERT
+            self.pending[key] = (operation, instance)
+            if len(self.pending) >= config.Database.WriteBehind.batch_size:
+                self.condition.notify_all()
+
+    def run(self):
+        flush_interval = config.Database.WriteBehind.flush_interval_ms / 1000
+        while True:
+            with self.condition:
+                if len(self.pending) < config.Database.WriteBehind.batch_size:
+                    self.condition.wait(flush_interval)
+            self.flush_batch()
+
+    def flush_batch(self):
+        with self.condition:
+            # Only one batch in flight, so batches are committed in queue order.
+            while self.flushing:
+                self.condition.wait()
+            if not self.pending:
+                return 0
+            keys = list(self.pending)[:config.Database.WriteBehind.batch_size]
+            batch = [(key, self.pending.pop(key)) for key in keys]
+            self.flushing = True
+
+        self._flush(batch)
+        return len(batch)
+
+    # Blocks until everything queued so far for the given owner is flushed, rows of other owners stay queued. Returns
+    # False if any row couldn't be written.
+    def flush_owner(self, owner):
+        with self.condition:
+            while self.flushing:
+                self.condition.wait()
+            keys = [key for key, (operation, instance) in self.pending.items() if self.owner_of(instance) == owner]
+            if not keys:
+                return True
+            batch = [(key, self.pending.pop(key)) for key in keys]
+            self.flushing = True
+
+        return self._flush(batch) == 0
+
+    # Writes the batch, self.flushing must be set by the caller. Returns how many rows couldn't be written.
+    def _flush(self, batch):
+        dead_letters = 0
+        start_time = time.perf_counter()
+        try:
+            try:
+                self._write([entry for key, entry in batch])
+            except Exception:
+                Logger.warning(f'{self.name} write behind batch failed, writing its rows one by one: '
+                               f'{traceback.format_exc()}')
+                Metrics.increment(f'write_behind.{self.name}.failures')
+                # A single bad row must not hold back the rest, nor every write queued after it.
+                for key, entry in batch:
+                    try:
+                        self._write([entry])
+                    except Exception:
+                        Logger.error(f'{self.name} write behind dropped {entry[1]!r}: {traceback.format_exc()}')
+                        dead_letters += 1
+                        Metrics.increment(f'write_behind.{self.name}.dead_letters')
+                        with self.condition:
+                            self.dead_letters.append(entry)
+            Metrics.increment(f'write_behind.{self.name}.rows', len(batch))
+            Metrics.add_sample(f'write_behind.{self.name}.flush_ms', (time.perf_counter() - start_time) * 1000)
+        finally:
+            with self.condition:
+                self.flushing = False
+                self.condition.notify_all()
+
+        return dead_letters
+
+    def _write(self, entries):
+        db_session = self.session_holder()
+        db_session.begin()
+        try:
+            for operation, instance in entries:
+                if operation == DELETE:
+                    # Looked up by primary key, a row already gone (or never written) has nothing left to delete.
+                    persistent_instance = db_session.get(type(instance),
+                                                         inspect(instance).mapper.primary_key_from_instance(instance))
+                    if persistent_instance is not None:
+                        db_session.delete(persistent_instance)
+                else:
+                    db_session.merge(instance)
+            db_session.commit()
+        except:
+            db_session.rollback()
+            raise
+        finally:
+            db_session.close()
+
+    # Blocks until everything queued so far is flushed, used on shutdown. Returns False if any row couldn't be written.
+    def flush(self):
+        with self.condition:
+            dead_letter_count = len(self.dead_letters)
+        while self.flush_batch():
+            pass
+        Metrics.set(f'write_behind.{self.name}.pending', len(self.pending))
+        with self.condition:
+            return len(self.dead_letters) == dead_letter_count
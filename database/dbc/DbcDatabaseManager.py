@@ -1,10 +1,15 @@
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 
+from database.DatabaseWorkerPool import DatabaseWorkerPool
+from database.RecordType import record_type, stream_records
 from database.dbc.DbcModels import *
 from utils.ConfigManager import *
+from utils.Logger import Logger
+from utils.Metrics import Metrics
+from utils.TrigramIndex import TrigramIndex
 
 DB_USER = os.getenv('MYSQL_USERNAME', config.Database.Connection.username)
 DB_PASSWORD = os.getenv('MYSQL_PASSWORD', config.Database.Connection.password)
@@ -12,20 +17,92 @@ DB_HOST = os.getenv('MYSQL_HOST', config.Database.Connection.host)
 DB_DBC_NAME = config.Database.DBNames.dbc_db
 
 dbc_db_engine = create_engine(f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_DBC_NAME}?charset=utf8mb4',
-                              pool_pre_ping=True)
+                              pool_pre_ping=True, pool_size=config.Database.Pools.dbc.connections,
+                              max_overflow=0)
 SessionHolder = scoped_session(sessionmaker(bind=dbc_db_engine, autocommit=True, autoflush=True))
+# Queries that shouldn't block the caller run here.
+WORKER_POOL = DatabaseWorkerPool('dbc', config.Database.Pools.dbc.workers, dbc_db_engine)
+
+# Only enUS strings are used, other locales are left out of the records kept in memory.
+UNUSED_LOCALE_SUFFIXES = ('_enGB', '_koKR', '_frFR', '_deDE', '_enCN', '_zhCN', '_enTW', '_Mask')
+SpellRecord = record_type('SpellRecord', Spell, __name__, lambda key: not key.endswith(UNUSED_LOCALE_SUFFIXES))
+
+# DBC tables read at runtime, fully loaded on startup and indexed in memory.
+# Store name: (model, index key of a row, True if each key has one row or False for a list of rows).
+DBC_STORES = {
+    'chr_races': (ChrRaces, lambda row: row.ID, True),
+    'area_triggers': (AreaTrigger, lambda row: row.ID, True),
+    'emotes_text': (EmotesText, lambda row: row.ID, True),
+    'spell_cast_times': (SpellCastTimes, lambda row: row.ID, True),
+    'spell_ranges': (SpellRange, lambda row: row.ID, True),
+    'spell_durations': (SpellDuration, lambda row: row.ID, True),
+    'skill_line_abilities_by_skill_line': (SkillLineAbility, lambda row: row.SkillLine, False),
+    'char_start_outfits': (CharStartOutfit, lambda row: (row.RaceID, row.ClassID, row.GenderID), True),
+    'creature_display_infos': (CreatureDisplayInfo, lambda row: row.ID, True),
+    'gameobject_display_infos': (GameObjectDisplayInfo, lambda row: row.ID, True),
+    'cinematic_sequences': (CinematicSequence, lambda row: row.ID, True),
+    'maps': (Map, lambda row: row.ID, True),
+    'bank_bag_slot_prices': (BankBagSlotPrices, lambda row: row.ID, True),
+    'taxi_paths': (TaxiPath, lambda row: (row.FromTaxiNode, row.ToTaxiNode), True)
+}
 
 
 class DbcDatabaseManager(object):
-    # ChrRaces
+    # Runs function(*args) on this database worker pool, returns a concurrent.futures.Future.
+    @staticmethod
+    def submit(function, *args):
+        return WORKER_POOL.submit(function, *args)
+
+    # Data versioning
 
     @staticmethod
-    def chr_races_get_by_race(race):
+    def table_checksums(table_names):
+        dbc_db_session = SessionHolder()
+        res = dbc_db_session.execute(text(f'CHECKSUM TABLE {", ".join(table_names)}')).fetchall()
+        dbc_db_session.close()
+        return [(row[0], row[1]) for row in res]
+
+    # Set once startup loading is done, DBC queries after that are reported since everything should come from memory.
+    STARTUP_FINISHED = False
+
+    @staticmethod
+    def finish_startup():
+        DbcDatabaseManager.STARTUP_FINISHED = True
+
+    # In memory stores
+
+    class DbcStoreHolder:
+        STORES = {}
+
+        @staticmethod
+        def load_store(name, rows):
+            model, key_getter, unique = DBC_STORES[name]
+            store = {}
+            for row in rows:
+                if unique:
+                    # Same as the .first() lookups this replaces.
+                    store.setdefault(key_getter(row), row)
+                else:
+                    store.setdefault(key_getter(row), []).append(row)
+            DbcDatabaseManager.DbcStoreHolder.STORES[name] = store
+
+        @staticmethod
+        def get(name, key):
+            return DbcDatabaseManager.DbcStoreHolder.STORES[name].get(key)
+
+    @staticmethod
+    def dbc_store_get_all(name):
         dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(ChrRaces).filter_by(ID=race).first()
+        res = dbc_db_session.query(DBC_STORES[name][0]).all()
         dbc_db_session.close()
         return res
 
+    # ChrRaces
+
+    @staticmethod
+    def chr_races_get_by_race(race):
+        return DbcDatabaseManager.DbcStoreHolder.get('chr_races', race)
+
     # CharBaseInfo
 
     class CharBaseInfoHolder:
@@ -56,28 +133,24 @@ class DbcDatabaseManager(object):
 
     @staticmethod
     def area_trigger_get_by_id(trigger_id):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(AreaTrigger).filter_by(ID=trigger_id).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('area_triggers', trigger_id)
 
     # EmoteText
 
     @staticmethod
     def emote_text_get_by_id(emote_id):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(EmotesText).filter_by(ID=emote_id).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('emotes_text', emote_id)
 
     # Spell
 
     class SpellHolder:
         SPELLS = {}
+        SPELLS_BY_NAME = TrigramIndex()
 
         @staticmethod
         def load_spell(spell):
             DbcDatabaseManager.SpellHolder.SPELLS[spell.ID] = spell
+            DbcDatabaseManager.SpellHolder.SPELLS_BY_NAME.add(spell.Name_enUS, spell)
 
         @staticmethod
         def spell_get_by_id(spell_id):
@@ -104,46 +177,35 @@ class DbcDatabaseManager(object):
     @staticmethod
     def spell_get_all():
         dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(Spell).all()
-        dbc_db_session.close()
-        return res
+        query = dbc_db_session.query(*SpellRecord.COLUMNS)
+        return query.count(), stream_records(dbc_db_session, query, SpellRecord)
 
     @staticmethod
     def spell_get_by_name(spell_name):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(Spell).filter(Spell.Name_enUS.like('%' + spell_name + '%')).all()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.SpellHolder.SPELLS_BY_NAME.search(spell_name)
 
     @staticmethod
     def spell_cast_time_get_by_id(range_index):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(SpellCastTimes).filter_by(ID=range_index).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('spell_cast_times', range_index)
 
     @staticmethod
     def spell_range_get_by_id(range_index):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(SpellRange).filter_by(ID=range_index).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('spell_ranges', range_index)
 
     @staticmethod
     def spell_duration_get_by_id(duration_index):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(SpellDuration).filter_by(ID=duration_index).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('spell_durations', duration_index)
 
     # Skill
 
     class SkillHolder:
         SKILLS = {}
+        SKILLS_BY_NAME = TrigramIndex()
 
         @staticmethod
         def load_skill(skill):
             DbcDatabaseManager.SkillHolder.SKILLS[skill.ID] = skill
+            DbcDatabaseManager.SkillHolder.SKILLS_BY_NAME.add(skill.DisplayName_enUS, skill)
 
         @staticmethod
         def skill_get_by_id(skill_id):
@@ -159,17 +221,11 @@ class DbcDatabaseManager(object):
 
     @staticmethod
     def skill_get_by_type(skill_type):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(SkillLine).filter_by(SkillType=skill_type).all()
-        dbc_db_session.close()
-        return res
+        return [skill for skill in DbcDatabaseManager.SkillHolder.SKILLS.values() if skill.SkillType == skill_type]
 
     @staticmethod
     def skill_get_by_name(skill_type):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(SkillLine).filter(SkillLine.DisplayName_enUS.like('%' + skill_type + '%')).all()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.SkillHolder.SKILLS_BY_NAME.search(skill_type)
 
     class SkillLineAbilityHolder:
         SKILL_LINE_ABILITIES = {}
@@ -186,9 +242,9 @@ class DbcDatabaseManager(object):
 
     @staticmethod
     def skill_line_ability_get_by_skill_lines(skill_lines):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(SkillLineAbility).filter(SkillLineAbility.SkillLine.in_(skill_lines)).all()
-        dbc_db_session.close()
+        res = []
+        for skill_line in skill_lines:
+            res.extend(DbcDatabaseManager.DbcStoreHolder.get('skill_line_abilities_by_skill_line', skill_line) or [])
         return res
 
     @staticmethod
@@ -202,46 +258,31 @@ class DbcDatabaseManager(object):
 
     @staticmethod
     def char_start_outfit_get(race, class_, gender):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(CharStartOutfit).filter_by(RaceID=race, ClassID=class_, GenderID=gender).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('char_start_outfits', (race, class_, gender))
 
     # CreatureDisplayInfo
 
     @staticmethod
     def creature_display_info_get_by_id(display_id):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(CreatureDisplayInfo).filter_by(ID=display_id).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('creature_display_infos', display_id)
 
     # GameObjectDisplayInfo
 
     @staticmethod
     def gameobject_display_info_get_by_id(display_id):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(GameObjectDisplayInfo).filter_by(ID=display_id).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('gameobject_display_infos', display_id)
 
     # CinematicSequences
 
     @staticmethod
     def cinematic_sequences_get_by_id(cinematic_id):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(CinematicSequence).filter_by(ID=cinematic_id).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('cinematic_sequences', cinematic_id)
 
     # Map
 
     @staticmethod
     def map_get_by_id(map_id):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(Map).filter_by(ID=map_id).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('maps', map_id)
 
     @staticmethod
     def map_get_all_ids():
@@ -254,10 +295,7 @@ class DbcDatabaseManager(object):
 
     @staticmethod
     def bank_get_slot_cost(slot):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(BankBagSlotPrices).filter_by(ID=slot).first()
-        dbc_db_session.close()
-        return res.Cost
+        return DbcDatabaseManager.DbcStoreHolder.get('bank_bag_slot_prices', slot).Cost
 
     # Taxi
 
@@ -312,10 +350,7 @@ class DbcDatabaseManager(object):
 
     @staticmethod
     def taxi_path_get(from_node, to_node):
-        dbc_db_session = SessionHolder()
-        res = dbc_db_session.query(TaxiPath).filter_by(FromTaxiNode=from_node, ToTaxiNode=to_node).first()
-        dbc_db_session.close()
-        return res
+        return DbcDatabaseManager.DbcStoreHolder.get('taxi_paths', (from_node, to_node))
 
     @staticmethod
     def taxi_path_nodes_get_all():
@@ -374,3 +409,10 @@ class DbcDatabaseManager(object):
         res = dbc_db_session.query(FactionTemplate).all()
         dbc_db_session.close()
         return res
+
+
+@event.listens_for(dbc_db_engine, 'before_cursor_execute')
+def on_dbc_query(conn, cursor, statement, parameters, context, executemany):
+    if DbcDatabaseManager.STARTUP_FINISHED:
+        Metrics.increment('dbc.runtime_queries')
+        Logger.warning(f'DBC query after startup, it should be served from memory: {statement}')
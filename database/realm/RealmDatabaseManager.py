@@ -4,9 +4,14 @@ from sqlalchemy import create_engine, func
 from sqlalchemy.exc import StatementError
 from sqlalchemy.orm import sessionmaker, scoped_session
 
+from database.DatabaseWorkerPool import DatabaseWorkerPool, gather
+from database.GuidAllocator import GuidAllocator
+from database.RecordType import record_type, stream_records
+from database.WriteBehindQueue import WriteBehindQueue
 from database.realm.RealmModels import *
 from utils.ConfigManager import *
 from game.realm.AccountManager import AccountManager
+from utils.Logger import Logger
 from utils.constants.ItemCodes import InventorySlots
 from utils.constants.ObjectCodes import HighGuid
 
@@ -16,11 +21,32 @@ DB_HOST = os.getenv('MYSQL_HOST', config.Database.Connection.host)
 DB_REALM_NAME = config.Database.DBNames.realm_db
 
 realm_db_engine = create_engine(f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_REALM_NAME}?charset=utf8mb4',
-                                pool_pre_ping=True)
+                                pool_pre_ping=True, pool_size=config.Database.Pools.realm.connections,
+                                max_overflow=0)
 SessionHolder = scoped_session(sessionmaker(bind=realm_db_engine, autocommit=True, autoflush=False))
+# Queries that shouldn't block the caller run here.
+WORKER_POOL = DatabaseWorkerPool('realm', config.Database.Pools.realm.workers, realm_db_engine)
+# The character a written behind row belongs to, kept in its guid column unless listed here.
+WRITE_OWNER_COLUMNS = {CharacterInventory: 'owner', CharacterDeathbind: 'player_guid'}
+# Gameplay row changes (items, spells, skills, social, quests, reputation) are written behind, in batches.
+WRITE_BEHIND = WriteBehindQueue(SessionHolder, 'realm',
+                                lambda row: getattr(row, WRITE_OWNER_COLUMNS.get(type(row), 'guid'), None))
+# What name queries and name lookups need from every character, online or not.
+CharacterNameRecord = record_type('CharacterNameRecord', Character, __name__,
+                                  lambda key: key in ('guid', 'name', 'race', 'gender', 'class_'))
 
 
 class RealmDatabaseManager(object):
+    # Runs function(*args) on this database worker pool, returns a concurrent.futures.Future.
+    @staticmethod
+    def submit(function, *args):
+        return WORKER_POOL.submit(function, *args)
+
+    # Once the server is loaded, every query runs on the worker pool (waiting for it) instead of the caller thread.
+    @staticmethod
+    def route_queries():
+        WORKER_POOL.route(RealmDatabaseManager)
+
     # Account stuff
 
     @staticmethod
@@ -60,6 +86,50 @@ class RealmDatabaseManager(object):
         realm_db_session.close()
         return characters if characters else []
 
+    # Returns (characters, {character guid: {slot: item}}, {character guid: guild id}) for the character screen, with
+    # one query each instead of one per character and equipment slot.
+    @staticmethod
+    def account_get_char_enum_data(account_id):
+        realm_db_session = SessionHolder()
+        characters = realm_db_session.query(Character).filter_by(account_id=account_id).all()
+        equipped_items = realm_db_session.query(CharacterInventory).join(
+            Character, CharacterInventory.owner == Character.guid).filter(
+            Character.account_id == account_id,
+            CharacterInventory.bag == InventorySlots.SLOT_INBACKPACK.value,
+            CharacterInventory.slot < InventorySlots.SLOT_BAG2.value).all()
+        guild_members = realm_db_session.query(GuildMember.guid, GuildMember.guild_id).join(
+            Character, GuildMember.guid == Character.guid).filter(Character.account_id == account_id).all()
+        realm_db_session.close()
+
+        items_by_owner = {}
+        for item in equipped_items:
+            items_by_owner.setdefault(item.owner, {})[item.slot] = item
+        guild_ids = {guid: guild_id for guid, guild_id in guild_members}
+        return characters, items_by_owner, guild_ids
+
+    # Write behind stuff
+
+    @staticmethod
+    def start_write_behind():
+        WRITE_BEHIND.start()
+
+    # Blocks until every queued write is flushed, returns False if some couldn't be written. Only for shutdown, the
+    # rest only need a single character's rows, see flush_character_writes.
+    @staticmethod
+    def flush_pending_writes():
+        if WRITE_BEHIND.flush():
+            return True
+        Logger.error('Some queued database writes could not be written, see previous errors.')
+        return False
+
+    # Blocks until every queued write of the given character is flushed, returns False if some couldn't be written.
+    @staticmethod
+    def flush_character_writes(guid):
+        if WRITE_BEHIND.flush_owner(guid & ~HighGuid.HIGHGUID_PLAYER):
+            return True
+        Logger.error(f'Some queued database writes of character {guid} could not be written, see previous errors.')
+        return False
+
     # Character stuff
 
     @staticmethod
@@ -69,6 +139,64 @@ class RealmDatabaseManager(object):
         realm_db_session.close()
         return character
 
+    # Everything a character needs on login, the queries run concurrently on the worker pool instead of one after
+    # another. Returns a Future of {name: loaded data}.
+    @staticmethod
+    def character_get_login_data(guid):
+        loaders = {
+            'character': RealmDatabaseManager.character_get_by_guid,
+            'spells': RealmDatabaseManager.character_get_spells,
+            'deathbind': RealmDatabaseManager.character_get_deathbind,
+            'social': RealmDatabaseManager.character_get_social,
+            'inventory': RealmDatabaseManager.character_get_inventory,
+            'skills': RealmDatabaseManager.character_get_skills,
+            'quests': RealmDatabaseManager.character_get_quests,
+            'reputations': RealmDatabaseManager.character_get_reputations,
+            'guild': RealmDatabaseManager.character_get_guild,
+            'group_id': RealmDatabaseManager.character_get_group_id,
+            'petition': RealmDatabaseManager.guild_petition_get_by_owner
+        }
+        return gather({name: WORKER_POOL.submit(loader, guid) for name, loader in loaders.items()})
+
+    # Character names
+
+    class CharacterNameHolder:
+        # guid: CharacterNameRecord
+        NAMES_BY_GUID = {}
+        # Lower case name: CharacterNameRecord, names are unique regardless of case.
+        NAMES_BY_NAME = {}
+
+        @staticmethod
+        def load_character_name(character_name):
+            RealmDatabaseManager.CharacterNameHolder.NAMES_BY_GUID[character_name.guid] = character_name
+            RealmDatabaseManager.CharacterNameHolder.NAMES_BY_NAME[character_name.name.lower()] = character_name
+
+        @staticmethod
+        def add_character(character):
+            RealmDatabaseManager.CharacterNameHolder.load_character_name(
+                CharacterNameRecord._make(getattr(character, field) for field in CharacterNameRecord._fields))
+
+        @staticmethod
+        def remove_character(guid):
+            character_name = RealmDatabaseManager.CharacterNameHolder.NAMES_BY_GUID.pop(
+                guid & ~HighGuid.HIGHGUID_PLAYER, None)
+            if character_name:
+                RealmDatabaseManager.CharacterNameHolder.NAMES_BY_NAME.pop(character_name.name.lower(), None)
+
+        @staticmethod
+        def get_by_guid(guid):
+            return RealmDatabaseManager.CharacterNameHolder.NAMES_BY_GUID.get(guid & ~HighGuid.HIGHGUID_PLAYER)
+
+        @staticmethod
+        def get_by_name(name):
+            return RealmDatabaseManager.CharacterNameHolder.NAMES_BY_NAME.get(name.lower())
+
+    @staticmethod
+    def character_get_all_names():
+        realm_db_session = SessionHolder()
+        query = realm_db_session.query(*CharacterNameRecord.COLUMNS)
+        return query.count(), stream_records(realm_db_session, query, CharacterNameRecord)
+
     @staticmethod
     def character_get_by_name(name):
         realm_db_session = SessionHolder()
@@ -78,11 +206,16 @@ class RealmDatabaseManager(object):
 
     @staticmethod
     def character_does_name_exist(name_to_check):
+        return RealmDatabaseManager.CharacterNameHolder.get_by_name(name_to_check) is not None
+
+    @staticmethod
+    def character_get_max_guid():
         realm_db_session = SessionHolder()
-        name = realm_db_session.query(Character.name).filter_by(name=name_to_check).first()
+        max_guid = realm_db_session.query(func.max(Character.guid)).scalar()
         realm_db_session.close()
-        return name is not None
+        return max_guid
 
+    # The guid is allocated from CHARACTER_GUIDS and the name cache updated by the caller, on the world loop.
     @staticmethod
     def character_create(character):
         realm_db_session = SessionHolder()
@@ -99,6 +232,27 @@ class RealmDatabaseManager(object):
         realm_db_session.flush()
         realm_db_session.close()
 
+    # Written behind along with the rest of the character rows, see flush_character_writes.
+    @staticmethod
+    def character_queue_update(character):
+        WRITE_BEHIND.merge(character)
+
+    # Writes all the given characters with a single executemany UPDATE, in one transaction.
+    @staticmethod
+    def character_bulk_update(characters):
+        mappings = [{column.key: getattr(character, column.key) for column in Character.__mapper__.column_attrs}
+                    for character in characters]
+        realm_db_session = SessionHolder()
+        realm_db_session.begin()
+        try:
+            realm_db_session.bulk_update_mappings(Character, mappings)
+            realm_db_session.commit()
+        except:
+            realm_db_session.rollback()
+            raise
+        finally:
+            realm_db_session.close()
+
     @staticmethod
     def character_inventory_get(character_guid):
         realm_db_session = SessionHolder()
@@ -117,6 +271,8 @@ class RealmDatabaseManager(object):
 
     @staticmethod
     def character_delete(guid):
+        # Make sure no queued row of this character is written after it's gone.
+        RealmDatabaseManager.flush_character_writes(guid)
         realm_db_session = SessionHolder()
         char_to_delete = RealmDatabaseManager.character_get_by_guid(guid)
         if char_to_delete:
@@ -126,38 +282,35 @@ class RealmDatabaseManager(object):
             return 0
         return -1
 
+    @staticmethod
+    def character_inventory_get_max_guid():
+        realm_db_session = SessionHolder()
+        max_guid = realm_db_session.query(func.max(CharacterInventory.guid)).scalar()
+        realm_db_session.close()
+        return max_guid
+
+    # Items get their guid from memory, so the insert can be written behind like any other change.
     @staticmethod
     def character_inventory_add_item(item):
         if item:
-            realm_db_session = SessionHolder()
-            realm_db_session.add(item)
-            realm_db_session.flush()
-            realm_db_session.refresh(item)
-            realm_db_session.close()
+            if not item.guid:
+                item.guid = ITEM_GUIDS.allocate()
+            WRITE_BEHIND.insert(item)
 
     @staticmethod
     def character_inventory_update_item(item):
         if item:
-            realm_db_session = SessionHolder()
-            realm_db_session.merge(item)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.merge(item)
 
     @staticmethod
     def character_inventory_update_container_contents(container):
-        realm_db_session = SessionHolder()
         for item in container.sorted_slots.values():
-            realm_db_session.merge(item.item_instance)
-        realm_db_session.flush()
-        realm_db_session.close()
+            WRITE_BEHIND.merge(item.item_instance)
 
     @staticmethod
     def character_inventory_delete(item):
         if item:
-            realm_db_session = SessionHolder()
-            realm_db_session.delete(item)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.delete(item)
 
     @staticmethod
     def character_get_inventory(guid):
@@ -186,10 +339,7 @@ class RealmDatabaseManager(object):
     @staticmethod
     def character_update_deathbind(deathbind):
         if deathbind:
-            realm_db_session = SessionHolder()
-            realm_db_session.merge(deathbind)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.merge(deathbind)
 
     @staticmethod
     def character_get_deathbind(guid):
@@ -216,30 +366,19 @@ class RealmDatabaseManager(object):
 
     @staticmethod
     def character_update_social(character_social):
-        if len(character_social) > 0:
-            for entry in character_social:
-                realm_db_session = SessionHolder()
-                realm_db_session.merge(entry)
-                realm_db_session.flush()
-                realm_db_session.close()
+        for entry in character_social:
+            WRITE_BEHIND.merge(entry)
 
     @staticmethod
     def character_add_friend(character_social):
         if character_social:
-            realm_db_session = SessionHolder()
-            realm_db_session.add(character_social)
-            realm_db_session.flush()
-            realm_db_session.refresh(character_social)
-            realm_db_session.close()
+            WRITE_BEHIND.insert(character_social)
             return character_social
 
     @staticmethod
     def character_social_delete_friend(character_social):
         if character_social:
-            realm_db_session = SessionHolder()
-            realm_db_session.delete(character_social)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.delete(character_social)
 
     @staticmethod
     def character_get_skills(guid):
@@ -251,19 +390,12 @@ class RealmDatabaseManager(object):
     @staticmethod
     def character_add_skill(skill):
         if skill:
-            realm_db_session = SessionHolder()
-            realm_db_session.add(skill)
-            realm_db_session.flush()
-            realm_db_session.refresh(skill)
-            realm_db_session.close()
+            WRITE_BEHIND.insert(skill)
 
     @staticmethod
     def character_update_skill(skill):
         if skill:
-            realm_db_session = SessionHolder()
-            realm_db_session.merge(skill)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.merge(skill)
 
     @staticmethod
     def character_get_spells(guid):
@@ -275,24 +407,17 @@ class RealmDatabaseManager(object):
     @staticmethod
     def character_add_spell(spell):
         if spell:
-            realm_db_session = SessionHolder()
-            realm_db_session.add(spell)
-            realm_db_session.flush()
-            realm_db_session.refresh(spell)
-            realm_db_session.close()
+            WRITE_BEHIND.insert(spell)
 
     @staticmethod
     def character_update_spell(spell):
         if spell:
-            realm_db_session = SessionHolder()
-            realm_db_session.merge(spell)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.merge(spell)
 
     @staticmethod
-    def character_get_guild(character):
+    def character_get_guild(guid):
         realm_db_session = SessionHolder()
-        guild_member = realm_db_session.query(GuildMember).filter_by(guid=character.guid & ~HighGuid.HIGHGUID_PLAYER).first()
+        guild_member = realm_db_session.query(GuildMember).filter_by(guid=guid & ~HighGuid.HIGHGUID_PLAYER).first()
         guild = None
         if guild_member:
             guild = guild_member.guild
@@ -300,9 +425,9 @@ class RealmDatabaseManager(object):
         return guild
 
     @staticmethod
-    def character_get_group_id(character):
+    def character_get_group_id(guid):
         realm_db_session = SessionHolder()
-        group_member = realm_db_session.query(GroupMember).filter_by(guid=character.guid & ~HighGuid.HIGHGUID_PLAYER).first()
+        group_member = realm_db_session.query(GroupMember).filter_by(guid=guid & ~HighGuid.HIGHGUID_PLAYER).first()
         group_id = -1
         if group_member:
             group_id = group_member.group_id
@@ -326,30 +451,18 @@ class RealmDatabaseManager(object):
     @staticmethod
     def character_add_quest_status(quest_status):
         if quest_status:
-            realm_db_session = SessionHolder()
-            realm_db_session.add(quest_status)
-            realm_db_session.flush()
-            realm_db_session.refresh(quest_status)
-            realm_db_session.close()
+            WRITE_BEHIND.insert(quest_status)
 
+    # Written behind, so unlike the other deletes there is no result; deleting a quest the character doesn't have
+    # does nothing.
     @staticmethod
     def character_delete_quest(guid, quest_id):
-        realm_db_session = SessionHolder()
-        quest_to_delete = RealmDatabaseManager.character_get_quest_by_id(guid, quest_id)
-        if quest_to_delete:
-            realm_db_session.delete(quest_to_delete)
-            realm_db_session.flush()
-            realm_db_session.close()
-            return 0
-        return -1
-    
+        WRITE_BEHIND.delete(CharacterQuestState(guid=guid & ~HighGuid.HIGHGUID_PLAYER, quest=quest_id))
+
     @staticmethod
     def character_update_quest_status(quest_status):
         if quest_status:
-            realm_db_session = SessionHolder()
-            realm_db_session.merge(quest_status)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.merge(quest_status)
 
     @staticmethod
     def character_get_reputations(character_guid):
@@ -361,19 +474,12 @@ class RealmDatabaseManager(object):
     @staticmethod
     def character_update_reputation(reputation):
         if reputation:
-            realm_db_session = SessionHolder()
-            realm_db_session.merge(reputation)
-            realm_db_session.flush()
-            realm_db_session.close()
+            WRITE_BEHIND.merge(reputation)
 
     @staticmethod
     def character_add_reputation(reputation):
-        realm_db_session = SessionHolder()
-        realm_db_session.add(reputation)
-        realm_db_session.flush()
-        realm_db_session.refresh(reputation)
-        realm_db_session.close()
-    
+        WRITE_BEHIND.insert(reputation)
+
     # Ticket stuff
 
     @staticmethod
@@ -436,11 +542,11 @@ class RealmDatabaseManager(object):
         realm_db_session.close()
 
     @staticmethod
-    def group_get_all():
+    def group_get_by_id(group_id):
         realm_db_session = SessionHolder()
-        groups = realm_db_session.query(Group).all()
+        group = realm_db_session.query(Group).filter_by(group_id=group_id).first()
         realm_db_session.close()
-        return groups
+        return group
 
     @staticmethod
     def group_get_members(group):
@@ -505,11 +611,18 @@ class RealmDatabaseManager(object):
         return guild_members
 
     @staticmethod
-    def guild_get_all():
+    def guild_get_by_id(guild_id):
         realm_db_session = SessionHolder()
-        guilds = realm_db_session.query(Guild).all()
+        guild = realm_db_session.query(Guild).filter_by(guild_id=guild_id).first()
         realm_db_session.close()
-        return guilds
+        return guild
+
+    @staticmethod
+    def guild_get_by_name(guild_name):
+        realm_db_session = SessionHolder()
+        guild = realm_db_session.query(Guild).filter_by(name=guild_name).first()
+        realm_db_session.close()
+        return guild
 
     @staticmethod
     def guild_get_accounts(guild_id):
@@ -586,3 +699,7 @@ class RealmDatabaseManager(object):
         realm_db_session.delete(petition)
         realm_db_session.flush()
         realm_db_session.close()
+
+
+CHARACTER_GUIDS = GuidAllocator('character', RealmDatabaseManager.character_get_max_guid)
+ITEM_GUIDS = GuidAllocator('item', RealmDatabaseManager.character_inventory_get_max_guid)
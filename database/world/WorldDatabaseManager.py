@@ -1,12 +1,14 @@
 import os
 
-from sqlalchemy import create_engine, func
+from sqlalchemy import create_engine, func, text
 from sqlalchemy.exc import StatementError
-from sqlalchemy.orm import sessionmaker, scoped_session
-from difflib import SequenceMatcher
+from sqlalchemy.orm import sessionmaker, scoped_session, joinedload
 
+from database.DatabaseWorkerPool import DatabaseWorkerPool
+from database.RecordType import record_type, stream_records, STREAM_BATCH_SIZE
 from database.world.WorldModels import *
 from utils.ConfigManager import *
+from utils.TrigramIndex import TrigramIndex
 from utils.constants.ObjectCodes import HighGuid
 
 DB_USER = os.getenv('MYSQL_USERNAME', config.Database.Connection.username)
@@ -15,11 +17,45 @@ DB_HOST = os.getenv('MYSQL_HOST', config.Database.Connection.host)
 DB_WORLD_NAME = config.Database.DBNames.world_db
 
 world_db_engine = create_engine(f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_WORLD_NAME}?charset=utf8mb4',
-                                pool_pre_ping=True)
+                                pool_pre_ping=True, pool_size=config.Database.Pools.world.connections,
+                                max_overflow=0)
 SessionHolder = scoped_session(sessionmaker(bind=world_db_engine, autocommit=True, autoflush=True))
+# Queries that shouldn't block the caller run here.
+WORKER_POOL = DatabaseWorkerPool('world', config.Database.Pools.world.workers, world_db_engine)
+
+# Read only templates kept in memory.
+ItemTemplateRecord = record_type('ItemTemplateRecord', ItemTemplate, __name__)
+QuestTemplateRecord = record_type('QuestTemplateRecord', QuestTemplate, __name__)
+WorldportRecord = record_type('WorldportRecord', Worldports, __name__)
 
 
 class WorldDatabaseManager(object):
+    # Runs function(*args) on this database worker pool, returns a concurrent.futures.Future.
+    @staticmethod
+    def submit(function, *args):
+        return WORKER_POOL.submit(function, *args)
+
+    # Once the server is loaded, every query runs on the worker pool (waiting for it) instead of the caller thread.
+    @staticmethod
+    def route_queries():
+        WORKER_POOL.route(WorldDatabaseManager)
+
+    # Data versioning
+
+    @staticmethod
+    def applied_updates_get_all_ids():
+        world_db_session = SessionHolder()
+        res = world_db_session.query(AppliedUpdates.id).order_by(AppliedUpdates.id).all()
+        world_db_session.close()
+        return [update_id[0] for update_id in res]
+
+    @staticmethod
+    def table_checksums(table_names):
+        world_db_session = SessionHolder()
+        res = world_db_session.execute(text(f'CHECKSUM TABLE {", ".join(table_names)}')).fetchall()
+        world_db_session.close()
+        return [(row[0], row[1]) for row in res]
+
     # Player stuff
 
     @staticmethod
@@ -77,32 +113,38 @@ class WorldDatabaseManager(object):
 
     # Worldport stuff
 
+    class WorldportHolder:
+        WORLDPORTS_BY_NAME = TrigramIndex()
+
+        @staticmethod
+        def load_worldport(worldport):
+            WorldDatabaseManager.WorldportHolder.WORLDPORTS_BY_NAME.add(worldport.name, worldport)
+
     @staticmethod
-    def worldport_get_by_name(name, return_all=False):
+    def worldport_get_all():
         world_db_session = SessionHolder()
-        best_matching_location = None
-        best_matching_ratio = 0
-        locations = world_db_session.query(Worldports).filter(Worldports.name.like('%' + name + '%')).all()
-        world_db_session.close()
+        query = world_db_session.query(*WorldportRecord.COLUMNS)
+        return query.count(), stream_records(world_db_session, query, WorldportRecord)
 
+    # Best match first.
+    @staticmethod
+    def worldport_get_by_name(name, return_all=False):
+        # Similar names are only suggested when searching, a single result must actually contain the name.
+        locations = WorldDatabaseManager.WorldportHolder.WORLDPORTS_BY_NAME.search(name, fuzzy=return_all)
         if return_all:
             return locations
-
-        for location in locations:
-            ratio = SequenceMatcher(None, location.name.lower(), name.lower()).ratio()
-            if ratio > best_matching_ratio:
-                best_matching_ratio = ratio
-                best_matching_location = location
-        return best_matching_location
+        return locations[0] if locations else None
 
     # Item stuff
 
     class ItemTemplateHolder:
         ITEM_TEMPLATES = {}
+        ITEM_TEMPLATES_BY_NAME = TrigramIndex()
 
         @staticmethod
         def load_item_template(item_template):
             WorldDatabaseManager.ItemTemplateHolder.ITEM_TEMPLATES[item_template.entry] = item_template
+            WorldDatabaseManager.ItemTemplateHolder.ITEM_TEMPLATES_BY_NAME.add(item_template.name, item_template)
 
         @staticmethod
         def item_template_get_by_entry(entry):
@@ -113,27 +155,16 @@ class WorldDatabaseManager(object):
     @staticmethod
     def item_template_get_all():
         world_db_session = SessionHolder()
-        res = world_db_session.query(ItemTemplate).filter_by().all()
-        world_db_session.close()
-        return res
+        query = world_db_session.query(*ItemTemplateRecord.COLUMNS)
+        return query.count(), stream_records(world_db_session, query, ItemTemplateRecord)
 
+    # Best match first.
     @staticmethod
     def item_template_get_by_name(name, return_all=False):
-        world_db_session = SessionHolder()
-        best_matching_item = None
-        best_matching_ratio = 0
-        items = world_db_session.query(ItemTemplate).filter(ItemTemplate.name.like('%' + name + '%')).all()
-        world_db_session.close()
-
+        items = WorldDatabaseManager.ItemTemplateHolder.ITEM_TEMPLATES_BY_NAME.search(name, fuzzy=return_all)
         if return_all:
             return items
-
-        for item in items:
-            ratio = SequenceMatcher(None, item.name.lower(), name.lower()).ratio()
-            if ratio > best_matching_ratio:
-                best_matching_ratio = ratio
-                best_matching_item = item
-        return best_matching_item
+        return items[0] if items else None
 
     # Page text stuff
 
@@ -149,20 +180,24 @@ class WorldDatabaseManager(object):
     @staticmethod
     def gameobject_get_all_spawns():
         world_db_session = SessionHolder()
-        res = world_db_session.query(SpawnsGameobjects).filter_by(ignored=0).all()
-        return res, world_db_session
+        query = world_db_session.query(SpawnsGameobjects).options(joinedload(SpawnsGameobjects.gameobject))\
+            .filter_by(ignored=0)
+        return query.count(), query.yield_per(STREAM_BATCH_SIZE), world_db_session
 
     @staticmethod
     def gameobject_spawn_get_by_guid(guid):
         world_db_session = SessionHolder()
-        res = world_db_session.query(SpawnsGameobjects).filter_by(spawn_id=guid & ~HighGuid.HIGHGUID_GAMEOBJECT).first()
-        return res, world_db_session
+        res = world_db_session.query(SpawnsGameobjects).options(joinedload(SpawnsGameobjects.gameobject))\
+            .filter_by(spawn_id=guid & ~HighGuid.HIGHGUID_GAMEOBJECT).first()
+        world_db_session.close()
+        return res
 
     @staticmethod
     def gameobject_template_get_by_entry(entry):
         world_db_session = SessionHolder()
         res = world_db_session.query(GameobjectTemplate).filter_by(entry=entry).first()
-        return res, world_db_session
+        world_db_session.close()
+        return res
 
     # Creature stuff
 
@@ -176,14 +211,15 @@ class WorldDatabaseManager(object):
     @staticmethod
     def creature_get_all_spawns():
         world_db_session = SessionHolder()
-        res = world_db_session.query(SpawnsCreatures).filter_by(ignored=0).all()
-        return res, world_db_session
+        query = world_db_session.query(SpawnsCreatures).filter_by(ignored=0)
+        return query.count(), query.yield_per(STREAM_BATCH_SIZE), world_db_session
 
     @staticmethod
     def creature_spawn_get_by_guid(guid):
         world_db_session = SessionHolder()
         res = world_db_session.query(SpawnsCreatures).filter_by(spawn_id=guid & ~HighGuid.HIGHGUID_UNIT).first()
-        return res, world_db_session
+        world_db_session.close()
+        return res
 
     @staticmethod
     def creature_get_model_info(display_id):
@@ -218,14 +254,17 @@ class WorldDatabaseManager(object):
     @staticmethod
     def creature_get_vendor_data(entry):
         world_db_session = SessionHolder()
-        res = world_db_session.query(NpcVendor).filter_by(entry=entry).all()
-        return res, world_db_session
+        res = world_db_session.query(NpcVendor).options(joinedload(NpcVendor.item_template)).filter_by(entry=entry).all()
+        world_db_session.close()
+        return res
 
     @staticmethod
     def creature_get_vendor_data_by_item(entry, item):
         world_db_session = SessionHolder()
-        res = world_db_session.query(NpcVendor).filter_by(entry=entry, item=item).first()
-        return res, world_db_session
+        res = world_db_session.query(NpcVendor).options(joinedload(NpcVendor.item_template))\
+            .filter_by(entry=entry, item=item).first()
+        world_db_session.close()
+        return res
 
     @staticmethod
     def creature_get_equipment_by_id(equipment_id):
@@ -296,6 +335,5 @@ class WorldDatabaseManager(object):
     @staticmethod
     def quest_template_get_all():
         world_db_session = SessionHolder()
-        res = world_db_session.query(QuestTemplate).filter_by(ignored=0).all()
-        world_db_session.close()
-        return res
+        query = world_db_session.query(*QuestTemplateRecord.COLUMNS).filter(QuestTemplate.ignored == 0)
+        return query.count(), stream_records(world_db_session, query, QuestTemplateRecord)
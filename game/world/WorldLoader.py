@@ -1,58 +1,133 @@
-from database.dbc.DbcDatabaseManager import DbcDatabaseManager
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from database.WorldDataSnapshot import WorldDataSnapshot
+from database.dbc.DbcDatabaseManager import DbcDatabaseManager, DBC_STORES
 from database.realm.RealmDatabaseManager import RealmDatabaseManager
 from database.world.WorldDatabaseManager import WorldDatabaseManager
 from game.world.managers.maps.MapManager import MapManager
 from game.world.managers.objects.creature.CreatureManager import CreatureManager
 from game.world.managers.objects.GameObjectManager import GameObjectManager
-from game.world.managers.objects.player.GroupManager import GroupManager
-from game.world.managers.objects.player.guild.GuildManager import GuildManager
 from utils.ConfigManager import config
 from utils.Logger import Logger
 
+try:
+    import resource
+except ImportError:  # Unix only.
+    resource = None
+
 
 class WorldLoader:
 
     @staticmethod
     def load_data():
-        # Map tiles
-        MapManager.initialize_maps()
+        start_time = time.time()
+        loaders = {}  # name: (loader, names of loaders it depends on)
+
+        # Template and DBC holders, from the snapshot if it's still up to date.
+        holder_loaders = WorldLoader.get_holder_loaders()
+        warm_start = False
+        if config.Server.Settings.use_data_snapshot:
+            snapshot_version = WorldDataSnapshot.get_version()
+            warm_start = WorldDataSnapshot.load(snapshot_version)
+            if not warm_start:
+                loaders.update(holder_loaders)
+                loaders['snapshot'] = (lambda: WorldDataSnapshot.save(snapshot_version), list(holder_loaders))
+        else:
+            loaders.update(holder_loaders)
 
-        # Gameobject spawns
+        # Map tiles, maps read their DBC entry.
+        loaders['maps'] = (MapManager.initialize_maps, ['dbc_stores'] if 'dbc_stores' in loaders else [])
+
+        # Spawns go into the maps and use templates (equipment, factions...).
+        spawn_dependencies = ['maps'] + [name for name in holder_loaders if name in loaders]
         if config.Server.Settings.load_gameobjects:
-            WorldLoader.load_gameobjects()
+            loaders['gameobjects'] = (WorldLoader.load_gameobjects, spawn_dependencies)
         else:
             Logger.info('Skipped game object loading.')
-
-        # Creature spawns
         if config.Server.Settings.load_creatures:
-            WorldLoader.load_creature_loot_templates()
-            WorldLoader.load_creatures()
-            WorldLoader.load_creature_quests()
-            WorldLoader.load_creature_involved_quests()
+            loaders['creatures'] = (WorldLoader.load_creatures, spawn_dependencies)
         else:
             Logger.info('Skipped creature loading.')
 
-        WorldLoader.load_item_templates()
-        WorldLoader.load_quests()
-        WorldLoader.load_spells()
-        WorldLoader.load_skills()
-        WorldLoader.load_skill_line_abilities()
-        WorldLoader.load_char_base_infos()
-        WorldLoader.load_taxi_nodes()
-        WorldLoader.load_taxi_path_nodes()
-        WorldLoader.load_factions()
-        WorldLoader.load_faction_templates()
-
-        # Character related data
-        WorldLoader.load_groups()
-        WorldLoader.load_guilds()
+        # Character related data, guilds and groups are loaded once one of their members logs in.
+        loaders['character_names'] = (WorldLoader.load_character_names, [])
+
+        timeline = WorldLoader.run_loaders(loaders)
+        DbcDatabaseManager.finish_startup()
+        RealmDatabaseManager.route_queries()
+        WorldDatabaseManager.route_queries()
+
+        Logger.success(f'World data loaded in {time.time() - start_time:.2f}s ({"warm" if warm_start else "cold"} start).')
+        for name, (loader_start, loader_end) in sorted(timeline.items(), key=lambda entry: entry[1][0]):
+            Logger.info(f'{name:<28} {loader_start:7.2f}s -> {loader_end:7.2f}s ({loader_end - loader_start:.2f}s)')
+        if resource:
+            # ru_maxrss is in kilobytes on Linux.
+            Logger.info(f'Peak memory usage after loading: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} MB')
+
+    @staticmethod
+    def get_holder_loaders():
+        loaders = {
+            # World database
+            'item_templates': (WorldLoader.load_item_templates, []),
+            'quests': (WorldLoader.load_quests, []),
+            'worldports': (WorldLoader.load_worldports, []),
+            # Dbc database
+            'dbc_stores': (WorldLoader.load_dbc_stores, []),
+            'spells': (WorldLoader.load_spells, []),
+            'skills': (WorldLoader.load_skills, []),
+            'skill_line_abilities': (WorldLoader.load_skill_line_abilities, []),
+            'char_base_infos': (WorldLoader.load_char_base_infos, []),
+            'taxi_nodes': (WorldLoader.load_taxi_nodes, []),
+            'taxi_path_nodes': (WorldLoader.load_taxi_path_nodes, []),
+            'factions': (WorldLoader.load_factions, []),
+            'faction_templates': (WorldLoader.load_faction_templates, [])
+        }
+        if config.Server.Settings.load_creatures:
+            loaders['creature_loot_templates'] = (WorldLoader.load_creature_loot_templates, [])
+            loaders['creature_quests'] = (WorldLoader.load_creature_quests, [])
+            loaders['creature_involved_quests'] = (WorldLoader.load_creature_involved_quests, [])
+        return loaders
+
+    # Runs every loader as soon as the ones it depends on are done, independent ones at the same time (each thread
+    # gets its own database session). Returns {name: (start, end)} in seconds since the first loader started.
+    @staticmethod
+    def run_loaders(loaders):
+        timeline = {}
+        pending = dict(loaders)
+        running = {}
+        load_start = time.time()
+
+        with ThreadPoolExecutor(max_workers=config.Server.Settings.startup_load_workers,
+                                thread_name_prefix='WorldLoader') as executor:
+            while pending or running:
+                for name, (loader, dependencies) in list(pending.items()):
+                    if all(dependency in timeline for dependency in dependencies):
+                        del pending[name]
+                        running[executor.submit(WorldLoader._run_timed, loader, load_start)] = name
+
+                if not running:
+                    raise RuntimeError(f'Unresolvable startup loader dependencies: {", ".join(pending)}')
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    timeline[running.pop(future)] = future.result()
+
+        return timeline
+
+    @staticmethod
+    def _run_timed(loader, load_start):
+        loader_start = time.time() - load_start
+        loader()
+        return loader_start, time.time() - load_start
 
     # World data holders
 
     @staticmethod
     def load_gameobjects():
-        gobject_spawns, session = WorldDatabaseManager.gameobject_get_all_spawns()
-        length = len(gobject_spawns)
+        # Templates are (re)loaded along with the spawns, drop any query response built from older ones.
+        GameObjectManager.invalidate_query_cache()
+        length, gobject_spawns, session = WorldDatabaseManager.gameobject_get_all_spawns()
         count = 0
 
         for gobject in gobject_spawns:
@@ -70,8 +145,9 @@ class WorldLoader:
 
     @staticmethod
     def load_creatures():
-        creature_spawns, session = WorldDatabaseManager.creature_get_all_spawns()
-        length = len(creature_spawns)
+        # Templates are (re)loaded along with the spawns, drop any query response built from older ones.
+        CreatureManager.invalidate_query_cache()
+        length, creature_spawns, session = WorldDatabaseManager.creature_get_all_spawns()
         count = 0
 
         for creature in creature_spawns:
@@ -102,8 +178,7 @@ class WorldLoader:
 
     @staticmethod
     def load_item_templates():
-        item_templates = WorldDatabaseManager.item_template_get_all()
-        length = len(item_templates)
+        length, item_templates = WorldDatabaseManager.item_template_get_all()
         count = 0
 
         for item_template in item_templates:
@@ -114,6 +189,32 @@ class WorldLoader:
 
         return length
 
+    @staticmethod
+    def load_dbc_stores():
+        length = len(DBC_STORES)
+        count = 0
+
+        for name in DBC_STORES:
+            DbcDatabaseManager.DbcStoreHolder.load_store(name, DbcDatabaseManager.dbc_store_get_all(name))
+
+            count += 1
+            Logger.progress('Loading DBC stores...', count, length)
+
+        return length
+
+    @staticmethod
+    def load_worldports():
+        length, worldports = WorldDatabaseManager.worldport_get_all()
+        count = 0
+
+        for worldport in worldports:
+            WorldDatabaseManager.WorldportHolder.load_worldport(worldport)
+
+            count += 1
+            Logger.progress('Loading worldports...', count, length)
+
+        return length
+
     @staticmethod
     def load_factions():
         factions = DbcDatabaseManager.faction_get_all()
@@ -144,8 +245,7 @@ class WorldLoader:
 
     @staticmethod
     def load_quests():
-        quest_templates = WorldDatabaseManager.quest_template_get_all()
-        length = len(quest_templates)
+        length, quest_templates = WorldDatabaseManager.quest_template_get_all()
         count = 0
 
         for quest_template in quest_templates:
@@ -158,8 +258,7 @@ class WorldLoader:
 
     @staticmethod
     def load_spells():
-        spells = DbcDatabaseManager.spell_get_all()
-        length = len(spells)
+        length, spells = DbcDatabaseManager.spell_get_all()
         count = 0
 
         for spell in spells:
@@ -271,30 +370,14 @@ class WorldLoader:
     # Character data holders
 
     @staticmethod
-    def load_groups():
-        groups = RealmDatabaseManager.group_get_all()
-        length = len(groups)
+    def load_character_names():
+        length, character_names = RealmDatabaseManager.character_get_all_names()
         count = 0
 
-        for group in groups:
-            GroupManager.load_group(group)
+        for character_name in character_names:
+            RealmDatabaseManager.CharacterNameHolder.load_character_name(character_name)
 
             count += 1
-            Logger.progress('Loading groups...', count, length)
-
-        return length
-
-    @staticmethod
-    def load_guilds():
-        guilds = RealmDatabaseManager.guild_get_all()
-        length = len(guilds)
-        count = 0
-
-        for guild in guilds:
-            if guild.name not in GuildManager.GUILDS:
-                GuildManager.load_guild(guild)
-
-                count += 1
-                Logger.progress('Loading guilds...', count, length)
+            Logger.progress('Loading character names...', count, length)
 
         return length
@@ -0,0 +1,106 @@
+import threading
+import time
+import traceback
+
+from game.world.WorldSessionStateHandler import WorldSessionStateHandler
+from game.world.managers.TimerManager import TimerManager
+from game.world.managers.maps.MapManager import MapManager
+from utils.ConfigManager import config
+from utils.Logger import Logger
+from utils.Metrics import Metrics
+from utils.TickProfiler import TickProfiler
+
+TICK_MS = config.Server.Settings.world_tick_ms
+
+
+def _interval_to_ticks(interval_ms):
+    return max(1, round(interval_ms / TICK_MS))
+
+
+class WorldLoop:
+    RUNNING = False
+    TICK = 0
+
+    @staticmethod
+    def start():
+        WorldLoop.RUNNING = True
+        world_loop_thread = threading.Thread(target=WorldLoop.run, name='WorldLoop')
+        world_loop_thread.daemon = True
+        world_loop_thread.start()
+
+    @staticmethod
+    def stop():
+        WorldLoop.RUNNING = False
+
+    @staticmethod
+    def run():
+        tick_seconds = TICK_MS / 1000
+        next_tick_time = time.perf_counter()
+
+        while WorldLoop.RUNNING:
+            now = time.perf_counter()
+            if now < next_tick_time:
+                time.sleep(next_tick_time - now)
+                continue
+
+            # Late ticks are run back to back to catch up, unless we are too far behind.
+            late_ticks = int((now - next_tick_time) / tick_seconds)
+            if late_ticks > config.Server.Settings.max_catch_up_ticks:
+                Logger.warning(f'World loop is {late_ticks} ticks behind, skipping them.')
+                Metrics.increment('world_loop.skipped_ticks', late_ticks)
+                next_tick_time = now
+
+            WorldLoop.tick()
+            next_tick_time += tick_seconds
+
+    @staticmethod
+    def tick():
+        tick_start = time.perf_counter()
+
+        for phase_name, phase_function, interval_ticks in PHASES:
+            if WorldLoop.TICK % interval_ticks != 0:
+                continue
+
+            phase_start = time.perf_counter()
+            try:
+                phase_function()
+            except Exception:
+                Logger.error(f'Error on world loop phase {phase_name}: {traceback.format_exc()}')
+            Metrics.add_sample(f'world_loop.phase.{phase_name}_ms', (time.perf_counter() - phase_start) * 1000)
+
+        tick_ms = (time.perf_counter() - tick_start) * 1000
+        Metrics.add_sample('world_loop.tick_ms', tick_ms)
+        TickProfiler.end_tick(WorldLoop.TICK, tick_ms)
+        if tick_ms > TICK_MS:
+            Metrics.increment('world_loop.overruns')
+            Logger.debug(f'World loop tick {WorldLoop.TICK} took {tick_ms:.2f}ms (budget {TICK_MS}ms).')
+
+        WorldLoop.TICK += 1
+
+    @staticmethod
+    def process_network_input():
+        for session in WorldSessionStateHandler.get_world_sessions():
+            # A failing handler must not stop the packets of every other session.
+            try:
+                session.process_incoming(config.Server.Settings.max_packets_per_tick)
+            except Exception:
+                Logger.error(f'[{session.client_address[0]}] Error handling packets: {traceback.format_exc()}')
+
+    @staticmethod
+    def flush_network_output():
+        for session in WorldSessionStateHandler.get_world_sessions():
+            session.flush_outgoing()
+
+
+# (name, function, interval in ticks), run in this order.
+PHASES = [
+    ('network', WorldLoop.process_network_input, 1),
+    ('timers', TimerManager.update, 1),
+    ('players', WorldSessionStateHandler.update_players, _interval_to_ticks(100)),
+    ('maps', MapManager.process_map_messages, 1),
+    ('creatures', MapManager.update_creatures, _interval_to_ticks(200)),
+    ('gameobjects', MapManager.update_gameobjects, _interval_to_ticks(1000)),
+    ('visibility', MapManager.deactivate_cells, _interval_to_ticks(120000)),
+    ('saving', WorldSessionStateHandler.save_characters, 1),
+    ('flush', WorldLoop.flush_network_output, 1)
+]
@@ -1,18 +1,24 @@
 import _queue
+import atexit
+import signal
 import threading
 import socket
+import traceback
 
+from concurrent.futures import Future
 from time import time
-from apscheduler.schedulers.background import BackgroundScheduler
 
 from game.world.WorldLoader import WorldLoader
+from game.world.WorldLoop import WorldLoop
 from game.world.WorldSessionStateHandler import WorldSessionStateHandler
 from game.world.managers.maps.MapManager import MapManager
 from game.world.opcode_handling.Definitions import Definitions
 from network.packet.PacketWriter import *
 from network.packet.PacketReader import *
+from database.realm.RealmDatabaseManager import RealmDatabaseManager
 from database.world.WorldDatabaseManager import *
 from utils.Logger import Logger
+from utils.Metrics import Metrics
 from utils.constants.AuthCodes import AuthCode
 
 STARTUP_TIME = time()
@@ -34,6 +40,17 @@ class WorldServerSessionHandler(object):
 
         self.incoming_pending = _queue.SimpleQueue()
         self.outgoing_pending = _queue.SimpleQueue()
+        # Packets enqueued during a world tick, sent together on the flush phase.
+        self.outgoing_buffer = []
+        self.outgoing_lock = threading.Lock()
+        self.outgoing_thread = None
+        # (opcode, future, continuation) of the database work this session is waiting for, see defer().
+        self.deferred = None
+        self.handling_opcode = 0
+
+        # Query responses already pushed to this client, which keeps them in its own cache.
+        self.sent_query_responses = set()
+        self.query_bytes_saved = 0
 
     def handle(self):
         try:
@@ -47,13 +64,10 @@ class WorldServerSessionHandler(object):
             if self.auth_challenge(self.request):
                 self.request.settimeout(120)  # 2 minutes timeout should be more than enough.
 
-                incoming_thread = threading.Thread(target=self.process_incoming)
-                incoming_thread.daemon = True
-                incoming_thread.start()
-
-                outgoing_thread = threading.Thread(target=self.process_outgoing)
-                outgoing_thread.daemon = True
-                outgoing_thread.start()
+                # Incoming packets are handled by the world loop network phase.
+                self.outgoing_thread = threading.Thread(target=self.process_outgoing)
+                self.outgoing_thread.daemon = True
+                self.outgoing_thread.start()
 
                 while self.receive(self.request) != -1 and self.keep_alive:
                     continue
@@ -65,24 +79,85 @@ class WorldServerSessionHandler(object):
         WorldSessionStateHandler.save_character(self.player_mgr)
 
     def enqueue_packet(self, data):
-        self.outgoing_pending.put_nowait(data)
+        with self.outgoing_lock:
+            self.outgoing_buffer.append(data)
+
+    def flush_outgoing(self):
+        with self.outgoing_lock:
+            if not self.outgoing_buffer:
+                return
+            packets = self.outgoing_buffer
+            self.outgoing_buffer = []
+        self.outgoing_pending.put_nowait(packets)
+
+    # Only for responses pushed on our own, explicit client queries should always be answered.
+    def enqueue_query_response(self, query_key, packet):
+        if query_key in self.sent_query_responses:
+            self.query_bytes_saved += len(packet)
+            Metrics.increment('query_cache.bytes_saved', len(packet))
+            return False
+
+        self.sent_query_responses.add(query_key)
+        self.enqueue_packet(packet)
+        return True
 
+    # Sends everything enqueued until disconnect() queues None, then closes the socket.
     def process_outgoing(self):
-        while self.keep_alive:
-            try:
-                data = self.outgoing_pending.get(block=True, timeout=None)
-                if data:  # Can be None if we shutdown the thread.
-                    self.request.sendall(data)
-            except OSError:
-                self.disconnect()
+        try:
+            while True:
+                packets = self.outgoing_pending.get(block=True, timeout=None)
+                if packets is None:
+                    break
+                # Compressed update packets are enqueued as Futures, wait for them here to keep ordering.
+                self.request.sendall(b''.join([packet.result() if isinstance(packet, Future) else packet
+                                               for packet in packets]))
+        except OSError:
+            self.disconnect()
+        except Exception:
+            # E.g. a failed packet compression, the client would be missing data from now on.
+            Logger.error(f'[{self.client_address[0]}] Error sending packets: {traceback.format_exc()}')
+            self.disconnect()
+        finally:
+            self.close_socket()
 
-    def process_incoming(self):
-        while self.keep_alive:
-            reader = self.incoming_pending.get(block=True, timeout=None)
-            if reader:  # Can be None if we shutdown the thread.
+    # Runs continuation(future result) on the world loop once the future is done. Until then, the next packets of this
+    # session wait, so they are still handled in order. The continuation returns a handler result.
+    def defer(self, future, continuation):
+        self.deferred = (self.handling_opcode, future, continuation)
+
+    # Called from the world loop network phase, handles up to max_packets pending packets.
+    def process_incoming(self, max_packets):
+        for _ in range(max_packets):
+            if not self.keep_alive:
+                break
+
+            if self.deferred:
+                opcode, future, continuation = self.deferred
+                if not future.done():
+                    break
+                self.deferred = None
+                self.handling_opcode = opcode
+                try:
+                    res = continuation(future.result())
+                except Exception:
+                    # Whatever the packet was waiting for is lost, don't leave the session half way through it.
+                    Logger.error(f'[{self.client_address[0]}] Error handling {OpCode(opcode).name}: '
+                                 f'{traceback.format_exc()}')
+                    res = -1
+                if res < 0:
+                    self.disconnect()
+                    break
+                continue
+
+            try:
+                reader = self.incoming_pending.get_nowait()
+            except _queue.Empty:
+                break
+            if reader:  # Can be None if we shutdown the session.
                 if reader.opcode:
                     handler, found = Definitions.get_handler_from_packet(self, reader.opcode)
                     if handler:
+                        self.handling_opcode = reader.opcode
                         res = handler(self, self.request, reader)
                         if res == 0:
                             Logger.debug(f'[{self.client_address[0]}] Handling {OpCode(reader.opcode).name}')
@@ -102,19 +177,23 @@ class WorldServerSessionHandler(object):
             return
         self.keep_alive = False
 
-        try:
-            if self.player_mgr:
-                self.player_mgr.logout()
-        except AttributeError:
-            pass
+        # Logged out by its map, which owns its grid state, instead of from this (socket) thread.
+        if self.player_mgr:
+            MapManager.post_message(self.player_mgr.map_, self.player_mgr.logout)
 
-        # Unblock queues if they are waiting inside loop.
-        if self.incoming_pending.empty():
-            self.incoming_pending.put_nowait(None)
-        if self.outgoing_pending.empty():
-            self.outgoing_pending.put_nowait(None)
+        # Whatever was enqueued so far (e.g. logout complete) is still sent, the outgoing thread closes the socket
+        # once done.
+        self.flush_outgoing()
+        self.outgoing_pending.put_nowait(None)
+
+        if self.query_bytes_saved:
+            Logger.debug(f'[{self.client_address[0]}] Skipped {self.query_bytes_saved} bytes of known query responses.')
 
         WorldSessionStateHandler.remove(self)
+        if not self.outgoing_thread:
+            self.close_socket()
+
+    def close_socket(self):
         try:
             self.request.shutdown(socket.SHUT_RDWR)
             self.request.close()
@@ -183,47 +262,20 @@ class WorldServerSessionHandler(object):
         return buffer
 
     @staticmethod
-    def schedule_background_tasks():
-        # Save characters
-        realm_saving_scheduler = BackgroundScheduler()
-        realm_saving_scheduler._daemon = True
-        realm_saving_scheduler.add_job(WorldSessionStateHandler.save_characters, 'interval',
-                                       seconds=config.Server.Settings.realm_saving_interval_seconds,
-                                       max_instances=1)
-        realm_saving_scheduler.start()
-
-        # Player updates
-        player_update_scheduler = BackgroundScheduler()
-        player_update_scheduler._daemon = True
-        player_update_scheduler.add_job(WorldSessionStateHandler.update_players, 'interval', seconds=0.1,
-                                        max_instances=1)
-        player_update_scheduler.start()
-
-        # Creature updates
-        creature_update_scheduler = BackgroundScheduler()
-        creature_update_scheduler._daemon = True
-        creature_update_scheduler.add_job(MapManager.update_creatures, 'interval', seconds=0.2,
-                                          max_instances=1)
-        creature_update_scheduler.start()
-
-        # Gameobject updates
-        gameobject_update_scheduler = BackgroundScheduler()
-        gameobject_update_scheduler._daemon = True
-        gameobject_update_scheduler.add_job(MapManager.update_gameobjects, 'interval', seconds=1.0,
-                                            max_instances=1)
-        gameobject_update_scheduler.start()
-
-        # Cell deactivation
-        cell_unloading_scheduler = BackgroundScheduler()
-        cell_unloading_scheduler._daemon = True
-        cell_unloading_scheduler.add_job(MapManager.deactivate_cells, 'interval', seconds=120.0,
-                                         max_instances=1)
-        cell_unloading_scheduler.start()
+    def on_terminate(signum, frame):
+        Logger.info('Flushing pending database writes...')
+        RealmDatabaseManager.flush_pending_writes()
+        raise SystemExit(0)
 
     @staticmethod
     def start():
         WorldLoader.load_data()
 
+        # Queued database writes are flushed before this process goes away.
+        RealmDatabaseManager.start_write_behind()
+        atexit.register(RealmDatabaseManager.flush_pending_writes)
+        signal.signal(signal.SIGTERM, WorldServerSessionHandler.on_terminate)
+
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
             server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
@@ -233,7 +285,7 @@ class WorldServerSessionHandler(object):
         server_socket.bind((config.Server.Connection.WorldServer.host, config.Server.Connection.WorldServer.port))
         server_socket.listen()
 
-        WorldServerSessionHandler.schedule_background_tasks()
+        WorldLoop.start()
 
         real_binding = server_socket.getsockname()
         Logger.success(f'World server started, listening on {real_binding[0]}:{real_binding[1]}')
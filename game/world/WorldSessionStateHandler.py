@@ -1,5 +1,10 @@
+import time
+from collections import deque
 from multiprocessing import Value
 from database.realm.RealmDatabaseManager import *
+from utils.ConfigManager import config
+from utils.Metrics import Metrics
+from utils.TickProfiler import TickProfiler
 
 WORLD_SESSIONS = []
 CURRENT_SESSIONS = Value('i', 0)
@@ -11,8 +16,18 @@ PLAYER_BY_NAME = {}
 SESSION_BY_GUID = {}
 SESSION_BY_NAME = {}
 
+# Periodic saves are spread over the saving interval, each character being checked on its own slot (guid based).
+SAVE_SLOTS = max(1, round(config.Server.Settings.realm_saving_interval_seconds * 1000 /
+                          config.Server.Settings.world_tick_ms))
+# Changed characters waiting to be written, when a tick runs out of save time budget.
+PENDING_SAVES = deque()
+PENDING_SAVE_GUIDS = set()
+
 
 class WorldSessionStateHandler(object):
+    SAVE_SLOT = 0
+    # Running average of the seconds a bulk update takes per character, sizes batches to the remaining budget.
+    SAVE_SECONDS_PER_CHARACTER = 0
 
     @staticmethod
     def add(session):
@@ -103,21 +118,83 @@ class WorldSessionStateHandler(object):
         for session in WORLD_SESSIONS:
             if session.player_mgr and session.player_mgr.online:
                 if not session.player_mgr.update_lock:
+                    start = TickProfiler.start()
                     session.player_mgr.update()
+                    TickProfiler.record('players.update', session.player_mgr.map_, start)
 
+    # Called every world tick, checks the characters on the current save slot and writes the changed ones in bulk,
+    # within the per tick database time budget.
     @staticmethod
     def save_characters():
-        try:
-            for session in WorldSessionStateHandler.get_world_sessions():
-                if session.player_mgr and session.player_mgr.online:
-                    WorldSessionStateHandler.save_character(session.player_mgr)
-        except AttributeError:
-            pass
+        start = time.perf_counter()
+        slot = WorldSessionStateHandler.SAVE_SLOT
+        WorldSessionStateHandler.SAVE_SLOT = (slot + 1) % SAVE_SLOTS
+
+        for session in WorldSessionStateHandler.get_world_sessions():
+            player_mgr = session.player_mgr
+            if player_mgr and player_mgr.online and player_mgr.guid % SAVE_SLOTS == slot \
+                    and player_mgr.guid not in PENDING_SAVE_GUIDS:
+                PENDING_SAVES.append(player_mgr)
+                PENDING_SAVE_GUIDS.add(player_mgr.guid)
+
+        written = 0
+        budget = config.Server.Settings.save_time_budget_ms / 1000
+        while PENDING_SAVES and time.perf_counter() - start < budget:
+            # Only as many characters as the remaining budget allows, so a batch doesn't overrun it.
+            batch_size = config.Server.Settings.save_batch_size
+            save_cost = WorldSessionStateHandler.SAVE_SECONDS_PER_CHARACTER
+            if save_cost:
+                remaining = budget - (time.perf_counter() - start)
+                batch_size = max(1, min(batch_size, int(remaining / save_cost)))
+
+            changed_players = []
+            while PENDING_SAVES and len(changed_players) < batch_size:
+                player_mgr = PENDING_SAVES.popleft()
+                PENDING_SAVE_GUIDS.discard(player_mgr.guid)
+                try:
+                    # Might have logged out or been force saved (logout, teleport) while waiting.
+                    if not player_mgr.online:
+                        continue
+                    player_mgr.sync_player()
+                    if player_mgr.has_unsaved_changes():
+                        changed_players.append(player_mgr)
+                except AttributeError:
+                    pass
+
+            if changed_players:
+                write_start = time.perf_counter()
+                RealmDatabaseManager.character_bulk_update([player_mgr.player for player_mgr in changed_players])
+                for player_mgr in changed_players:
+                    player_mgr.mark_saved()
+                written += len(changed_players)
+                WorldSessionStateHandler._update_save_cost((time.perf_counter() - write_start) / len(changed_players))
+
+        if written:
+            Metrics.increment('saving.characters_written', written)
+            Metrics.add_sample('saving.tick_ms', (time.perf_counter() - start) * 1000)
+        Metrics.set('saving.pending', len(PENDING_SAVES))
+
+    @staticmethod
+    def _update_save_cost(seconds_per_character):
+        if not WorldSessionStateHandler.SAVE_SECONDS_PER_CHARACTER:
+            WorldSessionStateHandler.SAVE_SECONDS_PER_CHARACTER = seconds_per_character
+        else:
+            WorldSessionStateHandler.SAVE_SECONDS_PER_CHARACTER = \
+                WorldSessionStateHandler.SAVE_SECONDS_PER_CHARACTER * 0.8 + seconds_per_character * 0.2
+
+    # Saves the character on the next saving phase, ahead of the ones waiting for their slot.
+    @staticmethod
+    def queue_save(player_mgr):
+        if player_mgr.guid in PENDING_SAVE_GUIDS:
+            return
+        PENDING_SAVES.appendleft(player_mgr)
+        PENDING_SAVE_GUIDS.add(player_mgr.guid)
 
     @staticmethod
     def save_character(player_mgr):
         try:
             player_mgr.sync_player()
             RealmDatabaseManager.character_update(player_mgr.player)
+            player_mgr.mark_saved()
         except AttributeError:
             pass
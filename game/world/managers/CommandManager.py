@@ -8,6 +8,8 @@ from game.world.managers.objects.player.ChatManager import ChatManager
 from database.world.WorldDatabaseManager import WorldDatabaseManager
 from database.realm.RealmDatabaseManager import RealmDatabaseManager
 from utils.ConfigManager import config
+from utils.Metrics import Metrics
+from utils.TickProfiler import TickProfiler
 from utils.TextUtils import GameTextFormatter
 from utils.constants.ObjectCodes import HighGuid
 from utils.constants.UpdateFields import PlayerFields
@@ -494,6 +496,55 @@ class CommandManager(object):
 
         return 0, ''
 
+    @staticmethod
+    def metrics(world_session, args):
+        prefix = args.strip()
+        counters = Metrics.get_counters(prefix)
+
+        for name, value in counters.items():
+            ChatManager.send_system_message(world_session, f'|cFF00FFFF{name}|r: {value}')
+
+        sample_names = Metrics.get_sample_names(prefix)
+        for name in sample_names:
+            percentiles = ', '.join([f'p{percentile}: {value:.2f}'
+                                     for percentile, value in Metrics.get_percentiles(name).items()])
+            ChatManager.send_system_message(world_session, f'|cFF00FFFF{name}|r: {percentiles}')
+        return 0, f'{len(counters) + len(sample_names)} metrics shown.'
+
+    # .profile [count] | .profile on | .profile off | .profile slow <count> | .profile ticks | .profile reset
+    @staticmethod
+    def profile(world_session, args):
+        args = args.strip().split()
+        try:
+            if not args or args[0].isdigit():
+                count = int(args[0]) if args else 10
+                top = TickProfiler.get_top(count)
+                for subsystem, map_id, total_ms, calls in top:
+                    ChatManager.send_system_message(world_session,
+                                                    f'|cFF00FFFF{subsystem}|r (map {map_id}): {total_ms:.2f}ms, '
+                                                    f'{calls} calls, {total_ms / calls:.3f}ms avg')
+                return 0, f'{len(top)} subsystems shown.'
+            if args[0] in ('on', 'off'):
+                TickProfiler.set_enabled(args[0] == 'on')
+                return 0, f'profiler {"enabled" if TickProfiler.ENABLED else "disabled"}.'
+            if args[0] == 'slow':
+                count = int(args[1])
+                TickProfiler.set_sampling(count)
+                return 0, f'sampling the slowest {count} ticks.' if count else 'tick sampling disabled.'
+            if args[0] == 'ticks':
+                ticks = TickProfiler.get_slowest_ticks()
+                for tick_ms, tick, breakdown in ticks:
+                    details = ', '.join([f'{subsystem}: {ms:.2f}ms' for subsystem, ms in
+                                         sorted(breakdown.items(), key=lambda entry: entry[1], reverse=True)])
+                    ChatManager.send_system_message(world_session, f'|cFF00FFFFTick {tick}|r ({tick_ms:.2f}ms): {details}')
+                return 0, f'{len(ticks)} ticks shown.'
+            if args[0] == 'reset':
+                TickProfiler.reset()
+                return 0, 'profiler data cleared.'
+        except (IndexError, ValueError):
+            pass
+        return -1, 'usage: .profile [count] | on | off | slow <count> | ticks | reset'
+
 
 PLAYER_COMMAND_DEFINITIONS = {
     'help': CommandManager.help,
@@ -531,5 +582,7 @@ GM_COMMAND_DEFINITIONS = {
     'die': CommandManager.die,
     'kick': CommandManager.kick,
     'worldoff': CommandManager.worldoff,
-    'guildcreate': CommandManager.guildcreate
+    'guildcreate': CommandManager.guildcreate,
+    'metrics': CommandManager.metrics,
+    'profile': CommandManager.profile
 }
@@ -0,0 +1,129 @@
+import threading
+import time
+import traceback
+from math import ceil
+
+from utils.ConfigManager import config
+from utils.Logger import Logger
+from utils.Metrics import Metrics
+from utils.TickProfiler import TickProfiler
+
+# Slots per level, level 0 slots are one world tick wide, each next level slot spans a whole lower level.
+WHEEL_LEVEL_SIZES = (256, 64, 64, 64)
+
+
+class Timer(object):
+    def __init__(self, due_time, expire_tick, callback):
+        self.due_time = due_time
+        self.expire_tick = expire_tick
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            Metrics.increment('timers.cancelled')
+
+
+class TimerWheel(object):
+    def __init__(self, tick_ms, level_sizes=WHEEL_LEVEL_SIZES):
+        self.tick_seconds = tick_ms / 1000
+        self.current_tick = 0
+        self.level_sizes = level_sizes
+        self.level_spans = []
+        span = 1
+        for size in level_sizes:
+            self.level_spans.append(span)
+            span *= size
+        self.levels = [[[] for _ in range(size)] for size in level_sizes]
+        self.overflow = []
+        self.lock = threading.Lock()
+
+    def schedule(self, delay_seconds, callback):
+        with self.lock:
+            expire_tick = self.current_tick + max(1, ceil(delay_seconds / self.tick_seconds))
+            timer = Timer(time.time() + delay_seconds, expire_tick, callback)
+            self._insert(timer)
+        Metrics.increment('timers.scheduled')
+        return timer
+
+    def _insert(self, timer):
+        delta = timer.expire_tick - self.current_tick
+        if delta <= 0:
+            # Already due, run it on the slot being processed.
+            self.levels[0][self.current_tick % self.level_sizes[0]].append(timer)
+            return
+
+        for level, size in enumerate(self.level_sizes):
+            span = self.level_spans[level]
+            if delta < span * size:
+                self.levels[level][(timer.expire_tick // span) % size].append(timer)
+                return
+        self.overflow.append(timer)
+
+    def advance(self):
+        with self.lock:
+            self.current_tick += 1
+
+            # Move timers from higher levels down once their slot comes up, highest level first.
+            highest_span = self.level_spans[-1] * self.level_sizes[-1]
+            if self.current_tick % highest_span == 0:
+                overflow = self.overflow
+                self.overflow = []
+                for timer in overflow:
+                    self._insert(timer)
+            for level in range(len(self.level_sizes) - 1, 0, -1):
+                span = self.level_spans[level]
+                if self.current_tick % span != 0:
+                    continue
+                slot = (self.current_tick // span) % self.level_sizes[level]
+                cascaded = self.levels[level][slot]
+                self.levels[level][slot] = []
+                for timer in cascaded:
+                    if not timer.cancelled:
+                        self._insert(timer)
+
+            slot = self.current_tick % self.level_sizes[0]
+            expired = self.levels[0][slot]
+            self.levels[0][slot] = []
+
+        start = TickProfiler.start()
+        fired = 0
+        now = time.time()
+        for timer in expired:
+            if timer.cancelled:
+                continue
+            # Ticks run back to back while the world loop catches up, don't fire before the wall clock.
+            if timer.due_time > now:
+                with self.lock:
+                    timer.expire_tick = self.current_tick + max(1, ceil((timer.due_time - now) / self.tick_seconds))
+                    self._insert(timer)
+                continue
+            timer.cancelled = True
+            fired += 1
+            try:
+                timer.callback()
+            except Exception:
+                Logger.error(f'Error running timer callback: {traceback.format_exc()}')
+
+        if fired:
+            Metrics.increment('timers.fired', fired)
+            TickProfiler.record('timers.callbacks', None, start)
+
+
+class TimerManager(object):
+    WHEEL = TimerWheel(config.Server.Settings.world_tick_ms)
+
+    # Callbacks run on the world loop thread, once the delay (seconds) has passed.
+    @staticmethod
+    def schedule(delay_seconds, callback):
+        return TimerManager.WHEEL.schedule(delay_seconds, callback)
+
+    @staticmethod
+    def cancel(timer):
+        if timer:
+            timer.cancel()
+
+    @staticmethod
+    def update():
+        TimerManager.WHEEL.advance()
@@ -1,6 +1,8 @@
 import math
 
 from utils.ConfigManager import config
+from utils.Metrics import Metrics
+from utils.TickProfiler import TickProfiler
 from utils.constants.ObjectCodes import ObjectTypes
 
 TOLERANCE = 0.00001
@@ -132,7 +134,7 @@ class GridManager(object):
         return self.get_surrounding_objects(world_object, [ObjectTypes.TYPE_GAMEOBJECT])[2]
 
     def get_surrounding_player_by_guid(self, world_object, guid):
-        for p_guid, player in list(self.get_surrounding_players(world_object).items()):
+        for p_guid, player in self.get_surrounding_players(world_object).items():
             if p_guid == guid:
                 return player
         return None
@@ -140,19 +142,19 @@ class GridManager(object):
     def get_surrounding_unit_by_guid(self, world_object, guid, include_players=False):
         surrounding_units = self.get_surrounding_units(world_object, include_players)
         if include_players:
-            for p_guid, player in list(surrounding_units[0].items()):
+            for p_guid, player in surrounding_units[0].items():
                 if p_guid == guid:
                     return player
 
         creature_dict = surrounding_units[1] if include_players else surrounding_units
-        for u_guid, unit in list(creature_dict.items()):
+        for u_guid, unit in creature_dict.items():
             if u_guid == guid:
                 return unit
 
         return None
 
     def get_surrounding_gameobject_by_guid(self, world_object, guid):
-        for g_guid, gameobject in list(self.get_surrounding_gameobjects(world_object).items()):
+        for g_guid, gameobject in self.get_surrounding_gameobjects(world_object).items():
             if g_guid == guid:
                 return gameobject
         return None
@@ -180,16 +182,39 @@ class GridManager(object):
         return self.cells
 
     def update_creatures(self):
-        for key in list(self.active_cell_keys):
+        start = TickProfiler.start()
+        updated = 0
+        skipped = 0
+        for key in self.active_cell_keys:
             cell = self.cells[key]
-            for guid, creature in list(cell.creatures.items()):
-                creature.update()
+            if not cell.creatures:
+                continue
+
+            players_near = self.has_players_near(cell)
+            for guid, creature in cell.creatures.items():
+                if creature.should_update(players_near):
+                    creature.update()
+                    updated += 1
+                else:
+                    skipped += 1
+
+        Metrics.increment('creatures.updated', updated)
+        Metrics.increment('creatures.skipped', skipped)
+        TickProfiler.record('grid.creatures', self.map_id, start)
+
+    def has_players_near(self, cell):
+        for near_cell in self.get_surrounding_cells_by_cell(cell):
+            if near_cell.has_players():
+                return True
+        return False
 
     def update_gameobjects(self):
-        for key in list(self.active_cell_keys):
+        start = TickProfiler.start()
+        for key in self.active_cell_keys:
             cell = self.cells[key]
-            for guid, gameobject in list(cell.gameobjects.items()):
+            for guid, gameobject in cell.gameobjects.items():
                 gameobject.update()
+        TickProfiler.record('grid.gameobjects', self.map_id, start)
 
 
 class Cell(object):
@@ -235,10 +260,9 @@ class Cell(object):
             self.active_cell_callback(world_object)
 
             # Set this Cell and surrounding ones as Active
-            for cell_key in list(grid_manager.get_surrounding_cell_keys(world_object)):
+            for cell_key in grid_manager.get_surrounding_cell_keys(world_object):
                 # Load tile maps of adjacent cells if there's at least one creature on them.
-                creatures = list(grid_manager.cells[cell_key].creatures.values())
-                for creature in creatures:
+                for creature in grid_manager.cells[cell_key].creatures.values():
                     self.active_cell_callback(creature)
                 grid_manager.active_cell_keys.add(cell_key)
 
@@ -258,7 +282,7 @@ class Cell(object):
             self.gameobjects.pop(world_object.guid, None)
 
     def send_all(self, packet, source=None, exclude=None, use_ignore=False):
-        for guid, player_mgr in list(self.players.items()):
+        for guid, player_mgr in self.players.items():
             if player_mgr.online:
                 if source and player_mgr.guid == source.guid:
                     continue
@@ -273,7 +297,7 @@ class Cell(object):
         if range_ <= 0:
             self.send_all(packet, source, exclude)
         else:
-            for guid, player_mgr in list(self.players.items()):
+            for guid, player_mgr in self.players.items():
                 if player_mgr.online and player_mgr.location.distance(source.location) <= range_:
                     if not include_self and player_mgr.guid == source.guid:
                         continue
@@ -1,7 +1,11 @@
+import queue
+import threading
+import traceback
 from enum import IntEnum
 from database.dbc.DbcDatabaseManager import DbcDatabaseManager
 from game.world.managers.maps.GridManager import GridManager
 from utils.Logger import Logger
+from utils.Metrics import Metrics
 
 
 class MapType(IntEnum):
@@ -11,11 +15,71 @@ class MapType(IntEnum):
 
 class Map(object):
     def __init__(self, map_id, active_cell_callback):
+        self.map_id = map_id
         self.map_ = DbcDatabaseManager.map_get_by_id(map_id)
         self.grid_manager = GridManager(map_id, active_cell_callback)
         self.tiles_used = [[False for r in range(0, 64)] for c in range(0, 64)]
         self.tiles = [[None for r in range(0, 64)] for c in range(0, 64)]
+        # Commands for this map (grid changes, actions posted from other maps), only applied by the thread
+        # currently updating this map, so the grid has a single writer.
+        self.message_queue = queue.SimpleQueue()
+        # Guids with a grid update already queued, later updates for them are coalesced into it.
+        self.queued_updates = set()
+        self.queued_updates_lock = threading.Lock()
         Logger.success(f'Initialized map {self.map_.MapName_enUS}')
 
     def is_dungeon(self):
         return self.map_.IsInMap == MapType.INSTANCE
+
+    def is_active(self):
+        return len(self.grid_manager.active_cell_keys) > 0 or not self.message_queue.empty()
+
+    def post_message(self, action):
+        self.message_queue.put_nowait(action)
+
+    def queue_object_update(self, world_object):
+        with self.queued_updates_lock:
+            if world_object.guid in self.queued_updates:
+                Metrics.increment('maps.coalesced_updates')
+                return
+            self.queued_updates.add(world_object.guid)
+        self.post_message(lambda: self._apply_object_update(world_object))
+
+    def queue_object_removal(self, world_object):
+        with self.queued_updates_lock:
+            self.queued_updates.discard(world_object.guid)
+        self.post_message(lambda: self.grid_manager.remove_object(world_object))
+
+    def _apply_object_update(self, world_object):
+        with self.queued_updates_lock:
+            self.queued_updates.discard(world_object.guid)
+        # The object might have moved to another map while this update was queued.
+        if world_object.map_ == self.map_id:
+            self.grid_manager.update_object(world_object)
+
+    def process_messages(self):
+        processed = 0
+        while True:
+            try:
+                action = self.message_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                action()
+            except Exception:
+                Logger.error(f'Error processing map {self.map_id} message: {traceback.format_exc()}')
+            processed += 1
+
+        if processed:
+            Metrics.increment('maps.processed_messages', processed)
+
+    # Grid changes made while updating are queued and applied in a batch once the update is done.
+    def update_creatures(self):
+        self.process_messages()
+        self.grid_manager.update_creatures()
+        self.process_messages()
+
+    def update_gameobjects(self):
+        self.process_messages()
+        self.grid_manager.update_gameobjects()
+        self.process_messages()
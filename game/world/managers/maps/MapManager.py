@@ -1,5 +1,7 @@
 import math
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from database.dbc.DbcDatabaseManager import DbcDatabaseManager
 from game.world.managers.maps.Constants import SIZE, RESOLUTION_ZMAP, RESOLUTION_WATER, RESOLUTION_TERRAIN, \
@@ -8,10 +10,14 @@ from game.world.managers.maps.Map import Map
 from game.world.managers.maps.MapTile import MapTile
 from utils.ConfigManager import config
 from utils.Logger import Logger
+from utils.Metrics import Metrics
 from utils.constants.ObjectCodes import ObjectTypes
 
 MAPS = {}
 MAP_LIST = DbcDatabaseManager.map_get_all_ids()
+# Maps are independent simulation units, they can be updated concurrently.
+MAP_WORKERS = ThreadPoolExecutor(max_workers=config.Server.Settings.map_workers, thread_name_prefix='MapWorker') \
+    if config.Server.Settings.map_workers > 1 else None
 
 
 class MapManager(object):
@@ -172,17 +178,23 @@ class MapManager(object):
     def should_relocate(world_object, destination, destination_map):
         grid_manager = MapManager.get_grid_manager_by_map_id(destination_map)
         destination_cells = grid_manager.get_surrounding_cells_by_location(destination.x, destination.y, destination_map)
-        current_cell = grid_manager.get_cells()[world_object.current_cell]
-        return current_cell in destination_cells
+        # Not placed yet if its first queued grid update didn't run, relocate it then.
+        current_cell = grid_manager.get_cells().get(world_object.current_cell)
+        return not current_cell or current_cell in destination_cells
 
+    # Grid changes are queued as commands for the owning map, which applies them in tick order.
     @staticmethod
     def update_object(world_object):
-        grid_manager = MapManager.get_grid_manager_by_map_id(world_object.map_)
-        grid_manager.update_object(world_object)
+        MAPS[world_object.map_].queue_object_update(world_object)
 
     @staticmethod
     def remove_object(world_object):
-        MapManager.get_grid_manager_by_map_id(world_object.map_).remove_object(world_object)
+        MAPS[world_object.map_].queue_object_removal(world_object)
+
+    @staticmethod
+    def post_message(map_id, action):
+        if map_id in MAPS:
+            MAPS[map_id].post_message(action)
 
     @staticmethod
     def send_surrounding(packet, world_object, include_self=True, exclude=None, use_ignore=False):
@@ -222,15 +234,39 @@ class MapManager(object):
     def get_surrounding_gameobject_by_guid(world_object, guid):
         return MapManager.get_grid_manager_by_map_id(world_object.map_).get_surrounding_gameobject_by_guid(world_object, guid)
 
+    @staticmethod
+    def process_map_messages():
+        MapManager._update_maps(Map.process_messages)
+
     @staticmethod
     def update_creatures():
-        for map_id, map_ in MAPS.items():
-            map_.grid_manager.update_creatures()
+        MapManager._update_maps(Map.update_creatures)
 
     @staticmethod
     def update_gameobjects():
-        for map_id, map_ in MAPS.items():
-            map_.grid_manager.update_gameobjects()
+        MapManager._update_maps(Map.update_gameobjects)
+
+    @staticmethod
+    def _update_maps(map_function):
+        active_maps = [map_ for map_ in list(MAPS.values()) if map_.is_active()]
+        if MAP_WORKERS and len(active_maps) > 1:
+            futures = [MAP_WORKERS.submit(MapManager._update_map, map_function, map_) for map_ in active_maps]
+            # Wait for every map before raising, so no map update overlaps the next phase.
+            wait(futures)
+            for future in futures:
+                future.result()
+        else:
+            for map_ in active_maps:
+                MapManager._update_map(map_function, map_)
+
+    @staticmethod
+    def _update_map(map_function, map_):
+        start_time = time.perf_counter()
+        try:
+            map_function(map_)
+        finally:
+            Metrics.add_sample(f'map.{map_.map_id}.{map_function.__name__}_ms',
+                               (time.perf_counter() - start_time) * 1000)
 
     @staticmethod
     def deactivate_cells():
@@ -16,6 +16,8 @@ from utils.constants.UpdateFields import ObjectFields, GameObjectFields
 
 
 class GameObjectManager(ObjectManager):
+    QUERY_CACHE = {}
+
     def __init__(self,
                  gobject_template,
                  gobject_instance=None,
@@ -54,7 +56,7 @@ class GameObjectManager(ObjectManager):
                 self.gobject_template.type == GameObjectTypes.TYPE_BUTTON:
             # TODO: Check locks for doors
             if self.state == GameObjectStates.GO_STATE_READY:
-                self.state = GameObjectStates.GO_STATE_ACTIVE
+                self.set_state(GameObjectStates.GO_STATE_ACTIVE)
                 # TODO: Trigger sripts / events on cooldown restart
                 self.send_update_surrounding()
         elif self.gobject_template.type == GameObjectTypes.TYPE_CAMERA:
@@ -129,31 +131,60 @@ class GameObjectManager(ObjectManager):
             return self.get_object_create_packet(is_self)
 
     def query_details(self):
-        name_bytes = PacketWriter.string_to_bytes(self.gobject_template.name)
-        data = pack(
-            f'<3I{len(name_bytes)}ssss10I',
-            self.gobject_template.entry,
-            self.gobject_template.type,
-            self.current_display_id,
-            name_bytes, b'\x00', b'\x00', b'\x00',
-            self.gobject_template.data0,
-            self.gobject_template.data1,
-            self.gobject_template.data2,
-            self.gobject_template.data3,
-            self.gobject_template.data4,
-            self.gobject_template.data5,
-            self.gobject_template.data6,
-            self.gobject_template.data7,
-            self.gobject_template.data8,
-            self.gobject_template.data9
-        )
-        return PacketWriter.get_packet(OpCode.SMSG_GAMEOBJECT_QUERY_RESPONSE, data)
+        return GameObjectManager.get_query_details_packet(self.gobject_template, self.current_display_id)
+
+    # The response only depends on the template and display id, cached by both until invalidate_query_cache.
+    @staticmethod
+    def get_query_details_packet(gobject_template, display_id):
+        cache_key = (gobject_template.entry, display_id)
+        query_packet = GameObjectManager.QUERY_CACHE.get(cache_key)
+        if not query_packet:
+            name_bytes = PacketWriter.string_to_bytes(gobject_template.name)
+            data = pack(
+                f'<3I{len(name_bytes)}ssss10I',
+                gobject_template.entry,
+                gobject_template.type,
+                display_id,
+                name_bytes, b'\x00', b'\x00', b'\x00',
+                gobject_template.data0,
+                gobject_template.data1,
+                gobject_template.data2,
+                gobject_template.data3,
+                gobject_template.data4,
+                gobject_template.data5,
+                gobject_template.data6,
+                gobject_template.data7,
+                gobject_template.data8,
+                gobject_template.data9
+            )
+            query_packet = PacketWriter.get_packet(OpCode.SMSG_GAMEOBJECT_QUERY_RESPONSE, data)
+            GameObjectManager.QUERY_CACHE[cache_key] = query_packet
+        return query_packet
+
+    # Must be called whenever gameobject templates are reloaded, every entry (and display id) if none given.
+    @staticmethod
+    def invalidate_query_cache(entry=None):
+        if entry is None:
+            GameObjectManager.QUERY_CACHE.clear()
+        else:
+            for cache_key in [cache_key for cache_key in GameObjectManager.QUERY_CACHE if cache_key[0] == entry]:
+                GameObjectManager.QUERY_CACHE.pop(cache_key, None)
+
+    def set_state(self, state):
+        self.state = state
+        self.set_uint32(GameObjectFields.GAMEOBJECT_STATE, self.state)
+
+    # Newly spawned, players around have never seen it yet.
+    def send_create_surrounding(self):
+        MapManager.send_surrounding(self.get_cached_create_packet(), self, include_self=False)
+        self.reset_fields()
 
     def send_update_surrounding(self):
+        # Players around already received the create block, only send the changed fields.
         update_packet = UpdatePacketFactory.compress_if_needed(
-            PacketWriter.get_packet(OpCode.SMSG_UPDATE_OBJECT,
-                                    self.get_full_update_packet(is_self=False)))
+            PacketWriter.get_packet(OpCode.SMSG_UPDATE_OBJECT, self.get_partial_update_packet()))
         MapManager.send_surrounding(update_packet, self, include_self=False)
+        self.reset_fields()
 
     # override
     def on_cell_change(self):
@@ -2,6 +2,7 @@ from struct import pack, unpack
 from math import pi
 
 from network.packet.update.UpdatePacketFactory import UpdatePacketFactory
+from utils.Metrics import Metrics
 from utils.constants.ObjectCodes import ObjectTypes, ObjectTypeIds, UpdateTypes, HighGuid
 from utils.ConfigManager import config
 from game.world.managers.abstractions.Vector import Vector
@@ -62,6 +63,8 @@ class ObjectManager(object):
         self.current_cell = ''
         self.last_tick = 0
         self.movement_spline = None
+        # (cache_key, packet) of the create packet seen by other players.
+        self.create_packet_cache = None
 
     def get_object_type_value(self):
         type_value = 0
@@ -70,8 +73,6 @@ class ObjectManager(object):
         return type_value
 
     def get_object_create_packet(self, is_self=True):
-        from game.world.managers.objects import UnitManager
-
         # Base structure
         data = self._get_base_structure(UpdateTypes.CREATE_OBJECT)
 
@@ -82,27 +83,62 @@ class ObjectManager(object):
         data += self._get_movement_fields()
 
         # Misc fields
-        combat_unit = UnitManager.UnitManager(self).combat_target if ObjectTypes.TYPE_UNIT in self.object_type else None
         data += pack(
             '<3IQ',
             1 if is_self else 0,  # Flags, 1 - Current player, 0 - Other player
             1 if self.get_type_id() == ObjectTypeIds.ID_PLAYER else 0,  # AttackCycle
             0,  # TimerId
-            combat_unit.guid if combat_unit else 0,  # Victim GUID
+            self._get_combat_target_guid(),  # Victim GUID
         )
 
-        # Normal update fields
-        data += self._get_fields_update()
+        # Normal update fields, every field holding a value
+        data += self._get_fields_update(is_create=True)
 
+        ObjectManager._count_update_bytes(UpdateTypes.CREATE_OBJECT, data)
         return data
 
+    def get_cached_create_packet(self):
+        # Create packet for other players, only rebuilt when fields, position, speeds or victim changed.
+        if self.create_packet_cache and self.create_packet_cache[0] == self._get_create_packet_cache_key():
+            Metrics.increment('create_cache.hits')
+            return self.create_packet_cache[1]
+
+        Metrics.increment('create_cache.misses')
+        update_packet = UpdatePacketFactory.compress_if_needed(
+            PacketWriter.get_packet(OpCode.SMSG_UPDATE_OBJECT, self.get_full_update_packet(is_self=False)))
+        # Building the create block may sync fields, so take the key afterwards.
+        self.create_packet_cache = (self._get_create_packet_cache_key(), update_packet)
+        return update_packet
+
+    def invalidate_create_packet_cache(self):
+        self.create_packet_cache = None
+
+    def _get_create_packet_cache_key(self):
+        return (
+            self.update_packet_factory.version,
+            self.location.x,
+            self.location.y,
+            self.location.z,
+            self.location.o,
+            self.movement_flags,
+            self.walk_speed,
+            self.running_speed,
+            self.swim_speed,
+            self.turn_rate,
+            self._get_combat_target_guid()
+        )
+
+    def _get_combat_target_guid(self):
+        return 0
+
     def get_partial_update_packet(self):
         # Base structure
         data = self._get_base_structure(UpdateTypes.PARTIAL)
 
-        # Normal update fields
+        # Normal update fields, only the ones changed since the last reset
         data += self._get_fields_update()
 
+        ObjectManager._count_update_bytes(UpdateTypes.PARTIAL, data)
         return data
 
     def get_movement_update_packet(self):
@@ -112,16 +148,20 @@ class ObjectManager(object):
         # Normal update fields
         data += self._get_movement_fields()
 
+        ObjectManager._count_update_bytes(UpdateTypes.MOVEMENT, data)
         return data
 
     def set_dirty(self, is_dirty=True):
         self.dirty = is_dirty
+        if is_dirty:
+            self.invalidate_create_packet_cache()
 
     def get_display_id(self):
         return self.current_display_id
 
     def set_display_id(self, display_id):
         self.current_display_id = display_id
+        self.invalidate_create_packet_cache()
 
     def reset_display_id(self):
         self.set_display_id(self.native_display_id)
@@ -176,16 +216,26 @@ class ObjectManager(object):
 
         return data
 
-    def _get_fields_update(self):
-        data = pack('<B', self.update_packet_factory.update_mask.block_count)
-        data += self.update_packet_factory.update_mask.to_bytes()
+    def _get_fields_update(self, is_create=False):
+        if is_create:
+            update_mask = self.update_packet_factory.create_mask
+        else:
+            update_mask = self.update_packet_factory.update_mask
+
+        data = pack('<B', update_mask.block_count)
+        data += update_mask.to_bytes()
 
-        for i in range(0, self.update_packet_factory.update_mask.field_count):
-            if self.update_packet_factory.update_mask.is_set(i):
-                data += self.update_packet_factory.update_values[i]
+        update_values = self.update_packet_factory.update_values
+        data += b''.join([update_values[i] for i in range(0, update_mask.field_count) if update_mask.is_set(i)])
 
         return data
 
+    @staticmethod
+    def _count_update_bytes(update_type, data):
+        update_type_name = UpdateTypes(update_type).name.lower()
+        Metrics.increment(f'update.{update_type_name}.blocks')
+        Metrics.increment(f'update.{update_type_name}.bytes', len(data))
+
     def set_int32(self, index, value):
         self.update_packet_factory.update(index, value, 'i')
 
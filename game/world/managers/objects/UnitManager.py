@@ -666,6 +666,7 @@ class UnitManager(ObjectManager):
 
     def set_weapon_mode(self, weapon_mode):
         self.sheath_state = weapon_mode
+        self.invalidate_create_packet_cache()
 
         # TODO: Implement temp enchants updates.
         if WeaponMode.NORMALMODE:
@@ -678,6 +679,7 @@ class UnitManager(ObjectManager):
 
     def set_shapeshift_form(self, shapeshift_form):
         self.shapeshift_form = shapeshift_form
+        self.invalidate_create_packet_cache()
 
     def has_form(self, shapeshift_form):
         return self.shapeshift_form == shapeshift_form
@@ -692,6 +694,7 @@ class UnitManager(ObjectManager):
 
     def set_stand_state(self, stand_state):
         self.stand_state = stand_state
+        self.invalidate_create_packet_cache()
 
     # override
     def set_display_id(self, display_id):
@@ -702,6 +705,10 @@ class UnitManager(ObjectManager):
 
         self.set_uint32(UnitFields.UNIT_FIELD_DISPLAYID, self.current_display_id)
 
+    # override
+    def _get_combat_target_guid(self):
+        return self.combat_target.guid if self.combat_target else 0
+
     def generate_proper_update_packet(self, is_self=False, create=False):
         update_packet = UpdatePacketFactory.compress_if_needed(PacketWriter.get_packet(
             OpCode.SMSG_UPDATE_OBJECT,
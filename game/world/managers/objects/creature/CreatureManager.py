@@ -4,6 +4,7 @@ from struct import unpack, pack
 
 from database.dbc.DbcDatabaseManager import DbcDatabaseManager
 from database.world.WorldDatabaseManager import WorldDatabaseManager
+from game.world.managers.TimerManager import TimerManager
 from game.world.managers.maps.MapManager import MapManager
 from game.world.managers.abstractions.Vector import Vector
 from game.world.managers.objects.UnitManager import UnitManager
@@ -12,14 +13,19 @@ from game.world.managers.objects.creature.CreatureLootManager import CreatureLoo
 from network.packet.PacketWriter import PacketWriter
 from utils import Formulas
 from utils.Formulas import UnitFormulas
+from utils.TickProfiler import TickProfiler
 from utils.constants.ItemCodes import InventoryTypes, ItemSubClasses
 from utils.constants.ObjectCodes import ObjectTypes, ObjectTypeIds, HighGuid, UnitDynamicTypes
 from utils.constants.OpCodes import OpCode
 from utils.constants.UnitCodes import UnitFlags, WeaponMode, CreatureTypes, MovementTypes, SplineFlags
 from utils.constants.UpdateFields import ObjectFields, UnitFields
 
+# Creature ticks between updates of idle creatures with players around.
+IDLE_UPDATE_INTERVAL = 5
+
 
 class CreatureManager(UnitManager):
+    QUERY_CACHE = {}
 
     def __init__(self,
                  creature_template,
@@ -61,7 +67,8 @@ class CreatureManager(UnitManager):
             self.fully_loaded = False
             self.is_evading = False
             self.wearing_offhand_weapon = False
-            self.respawn_timer = 0
+            self.respawn_timers = []
+            self.skipped_updates = 0
             self.is_spawned = True
             self.last_random_movement = 0
             self.random_movement_wait_time = randint(1, 12)
@@ -89,7 +96,7 @@ class CreatureManager(UnitManager):
         return choice(display_id_list) if len(display_id_list) > 0 else 4  # 4 = cube
 
     def send_inventory_list(self, world_session):
-        vendor_data, session = WorldDatabaseManager.creature_get_vendor_data(self.entry)
+        vendor_data = WorldDatabaseManager.creature_get_vendor_data(self.entry)
         item_count = len(vendor_data) if vendor_data else 0
 
         data = pack(
@@ -112,9 +119,8 @@ class CreatureManager(UnitManager):
                     0,  # durability
                     0,  # stack count
                 )
-                world_session.enqueue_packet(ItemManager(item_template=vendor_data_entry.item_template).query_details())
+                world_session.enqueue_packet(ItemManager.get_query_details_packet(vendor_data_entry.item_template))
 
-        session.close()
         world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_LIST_INVENTORY, data))
 
     def finish_loading(self):
@@ -237,18 +243,35 @@ class CreatureManager(UnitManager):
         return self.get_object_create_packet(is_self)
 
     def query_details(self):
-        name_bytes = PacketWriter.string_to_bytes(self.creature_template.name)
-        subname_bytes = PacketWriter.string_to_bytes(self.creature_template.subname)
-        data = pack(
-            f'<I{len(name_bytes)}ssss{len(subname_bytes)}s3I',
-            self.entry,
-            name_bytes, b'\x00', b'\x00', b'\x00',
-            subname_bytes,
-            self.creature_template.type_flags,
-            self.creature_type,
-            self.creature_template.beast_family
-        )
-        return PacketWriter.get_packet(OpCode.SMSG_CREATURE_QUERY_RESPONSE, data)
+        return CreatureManager.get_query_details_packet(self.creature_template)
+
+    # The response only depends on the template, cached by entry until invalidate_query_cache.
+    @staticmethod
+    def get_query_details_packet(creature_template):
+        query_packet = CreatureManager.QUERY_CACHE.get(creature_template.entry)
+        if not query_packet:
+            name_bytes = PacketWriter.string_to_bytes(creature_template.name)
+            subname_bytes = PacketWriter.string_to_bytes(creature_template.subname)
+            data = pack(
+                f'<I{len(name_bytes)}ssss{len(subname_bytes)}s3I',
+                creature_template.entry,
+                name_bytes, b'\x00', b'\x00', b'\x00',
+                subname_bytes,
+                creature_template.type_flags,
+                creature_template.type,
+                creature_template.beast_family
+            )
+            query_packet = PacketWriter.get_packet(OpCode.SMSG_CREATURE_QUERY_RESPONSE, data)
+            CreatureManager.QUERY_CACHE[creature_template.entry] = query_packet
+        return query_packet
+
+    # Must be called whenever creature templates are reloaded, every entry if none given.
+    @staticmethod
+    def invalidate_query_cache(entry=None):
+        if entry is None:
+            CreatureManager.QUERY_CACHE.clear()
+        else:
+            CreatureManager.QUERY_CACHE.pop(entry, None)
 
     def _perform_random_movement(self, now):
         if not self.in_combat and self.creature_instance.movement_type == MovementTypes.WANDER:
@@ -278,6 +301,29 @@ class CreatureManager(UnitManager):
 
             self.movement_manager.send_move_to([combat_location], self.running_speed, SplineFlags.SPLINEFLAG_RUNMODE)
 
+    # Level of detail: creatures doing something update every tick, idle ones with players around at a reduced
+    # rate and the rest sleep until a player comes close or something (combat, auras, dirty fields) wakes them up.
+    def should_update(self, players_near):
+        if self.is_busy():
+            self.skipped_updates = 0
+            return True
+        if not players_near:
+            # Asleep, the first update once woken up only restarts timing instead of catching up the whole nap.
+            self.last_tick = 0
+            return False
+
+        self.skipped_updates += 1
+        if self.skipped_updates >= IDLE_UPDATE_INTERVAL:
+            self.skipped_updates = 0
+            return True
+        return False
+
+    def is_busy(self):
+        return self.in_combat or self.combat_target or self.dirty or \
+            len(self.movement_manager.pending_waypoints) > 0 or \
+            len(self.spell_manager.casting_spells) > 0 or \
+            len(self.aura_manager.active_auras) > 0
+
     # override
     def update(self):
         now = time.time()
@@ -285,35 +331,35 @@ class CreatureManager(UnitManager):
             elapsed = now - self.last_tick
 
             if self.is_alive:
-                # Spell/aura updates
-                self.spell_manager.update(now)
-                self.aura_manager.update(elapsed)
                 # Movement Updates
+                start = TickProfiler.start()
                 self.movement_manager.update_pending_waypoints(elapsed)
+                TickProfiler.record('creature.waypoints', self.map_, start)
                 # Random Movement
+                start = TickProfiler.start()
                 self._perform_random_movement(now)
+                TickProfiler.record('creature.random_movement', self.map_, start)
                 # Combat movement
+                start = TickProfiler.start()
                 self._perform_combat_movement(now)
+                TickProfiler.record('creature.combat_movement', self.map_, start)
                 # Attack update
                 if self.combat_target and self.is_within_interactable_distance(self.combat_target):
+                    start = TickProfiler.start()
                     self.attack_update(elapsed)
-            # Dead
-            else:
-                self.respawn_timer += elapsed
-                if self.respawn_timer >= self.respawn_time:
-                    self.respawn()
-                # Destroy body when creature is about to respawn
-                elif self.is_spawned and self.respawn_timer >= self.respawn_time * 0.8:
-                    self.is_spawned = False
-                    MapManager.send_surrounding(self.get_destroy_packet(), self, include_self=False)
+                    TickProfiler.record('creature.attack', self.map_, start)
         self.last_tick = now
 
         if self.dirty:
-            MapManager.send_surrounding(self.generate_proper_update_packet(create=False), self, include_self=False)
+            start = TickProfiler.start()
+            # Skip empty values updates (e.g. only the position changed).
+            if self.update_packet_factory.has_pending_updates():
+                MapManager.send_surrounding(self.generate_proper_update_packet(create=False), self, include_self=False)
             MapManager.update_object(self)
             self.reset_fields()
 
             self.set_dirty(is_dirty=False)
+            TickProfiler.record('creature.object_update', self.map_, start)
 
     # override
     def respawn(self):
@@ -330,14 +376,16 @@ class CreatureManager(UnitManager):
         self.killed_by = None
 
         self.is_spawned = True
-        self.respawn_timer = 0
+        self.cancel_respawn_timers()
         self.respawn_time = randint(self.creature_instance.spawntimesecsmin, self.creature_instance.spawntimesecsmax)
 
-        MapManager.send_surrounding(self.generate_proper_update_packet(create=True), self, include_self=False)
+        MapManager.send_surrounding(self.get_cached_create_packet(), self, include_self=False)
 
     # override
     def die(self, killer=None):
-        super().die(killer)
+        if not super().die(killer):
+            return False
+
         self.loot_manager.generate_loot(killer)
 
         if killer and killer.get_type() == ObjectTypes.TYPE_PLAYER:
@@ -349,9 +397,24 @@ class CreatureManager(UnitManager):
         if self.loot_manager.has_loot():
             self.set_lootable(True)
 
+        # Destroy body when creature is about to respawn.
+        self.respawn_timers = [TimerManager.schedule(self.respawn_time * 0.8, self.despawn_corpse),
+                               TimerManager.schedule(self.respawn_time, self.respawn)]
+
         self.set_dirty()
         return True
 
+    def despawn_corpse(self):
+        if self.is_alive or not self.is_spawned:
+            return
+        self.is_spawned = False
+        MapManager.send_surrounding(self.get_destroy_packet(), self, include_self=False)
+
+    def cancel_respawn_timers(self):
+        for timer in self.respawn_timers:
+            TimerManager.cancel(timer)
+        self.respawn_timers.clear()
+
     def reward_kill_xp(self, player):
         # Critters don't award XP
         if self.creature_type == CreatureTypes.AMBIENT:
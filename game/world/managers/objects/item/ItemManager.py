@@ -41,6 +41,8 @@ AVAILABLE_EQUIP_SLOTS = [
 
 
 class ItemManager(ObjectManager):
+    QUERY_CACHE = {}
+
     def __init__(self,
                  item_template,
                  item_instance=None,
@@ -231,77 +233,101 @@ class ItemManager(ObjectManager):
         return None
 
     def query_details(self):
-        item_name_bytes = PacketWriter.string_to_bytes(self.item_template.name)
+        item_flags = self.item_instance.item_flags if self.item_instance else self.item_template.flags
+        return ItemManager.get_query_details_packet(self.item_template, item_flags)
+
+    # SMSG_ITEM_QUERY_SINGLE_RESPONSE only depends on the template and the item flags, cache the bytes.
+    @staticmethod
+    def get_query_details_packet(item_template, item_flags=None):
+        if item_flags is None:
+            item_flags = item_template.flags
+
+        cache_key = (item_template.entry, item_flags)
+        query_packet = ItemManager.QUERY_CACHE.get(cache_key)
+        if not query_packet:
+            query_packet = ItemManager._build_query_details_packet(item_template, item_flags)
+            ItemManager.QUERY_CACHE[cache_key] = query_packet
+        return query_packet
+
+    @staticmethod
+    def _build_query_details_packet(item_template, item_flags):
+        item_name_bytes = PacketWriter.string_to_bytes(item_template.name)
         data = pack(
             f'<3I{len(item_name_bytes)}ssss6I2i7I',
-            self.item_template.entry,
-            self.item_template.class_,
-            self.item_template.subclass,
+            item_template.entry,
+            item_template.class_,
+            item_template.subclass,
             item_name_bytes, b'\x00', b'\x00', b'\x00',
-            self.item_template.display_id,
-            self.item_template.quality,
-            self.item_instance.item_flags if self.item_instance else self.item_template.flags,
-            self.item_template.buy_price,
-            self.item_template.sell_price,
-            self.item_template.inventory_type,
-            self.item_template.allowable_class,
-            self.item_template.allowable_race,
-            self.item_template.item_level,
-            self.item_template.required_level,
-            self.item_template.required_skill,
-            self.item_template.required_skill_rank,
-            self.item_template.max_count,
-            self.item_template.stackable,
-            self.item_template.container_slots
+            item_template.display_id,
+            item_template.quality,
+            item_flags,
+            item_template.buy_price,
+            item_template.sell_price,
+            item_template.inventory_type,
+            item_template.allowable_class,
+            item_template.allowable_race,
+            item_template.item_level,
+            item_template.required_level,
+            item_template.required_skill,
+            item_template.required_skill_rank,
+            item_template.max_count,
+            item_template.stackable,
+            item_template.container_slots
         )
 
-        for stat in self.stats:
-            data += pack('<2i', stat.stat_type, stat.value)
+        for i in range(1, 11):
+            data += pack('<2i', getattr(item_template, f'stat_type{i}'), getattr(item_template, f'stat_value{i}'))
 
-        for damage_stat in self.damage_stats:
-            data += pack('<3i', int(damage_stat.minimum), int(damage_stat.maximum), damage_stat.stat_type)
+        for i in range(1, 6):
+            data += pack('<3i', int(getattr(item_template, f'dmg_min{i}')), int(getattr(item_template, f'dmg_max{i}')),
+                         getattr(item_template, f'dmg_type{i}'))
 
         data += pack(
             '<6i3I',
-            self.item_template.armor,
-            self.item_template.holy_res,
-            self.item_template.fire_res,
-            self.item_template.nature_res,
-            self.item_template.frost_res,
-            self.item_template.shadow_res,
-            self.item_template.delay,
-            self.item_template.ammo_type,
+            item_template.armor,
+            item_template.holy_res,
+            item_template.fire_res,
+            item_template.nature_res,
+            item_template.frost_res,
+            item_template.shadow_res,
+            item_template.delay,
+            item_template.ammo_type,
             0  # Durability, not implemented
         )
 
-        for spell_stat in self.spell_stats:
+        for i in range(1, 6):
             data += pack(
                 '<Q4i',
-                spell_stat.spell_id,
-                spell_stat.trigger,
-                spell_stat.charges,
-                spell_stat.cooldown,
-                spell_stat.category_cooldown
+                getattr(item_template, f'spellid_{i}'),
+                getattr(item_template, f'spelltrigger_{i}'),
+                getattr(item_template, f'spellcharges_{i}'),
+                getattr(item_template, f'spellcooldown_{i}'),
+                getattr(item_template, f'spellcategorycooldown_{i}')
             )
 
-        description_bytes = PacketWriter.string_to_bytes(self.item_template.description)
+        description_bytes = PacketWriter.string_to_bytes(item_template.description)
         data += pack(
             f'<I{len(description_bytes)}s5IiI',
-            self.item_template.bonding,
+            item_template.bonding,
             description_bytes,
-            self.item_template.page_text,
-            self.item_template.page_language,
-            self.item_template.page_material,
-            self.item_template.start_quest,
-            self.item_template.lock_id,
-            self.item_template.material,
-            self.item_template.sheath
+            item_template.page_text,
+            item_template.page_language,
+            item_template.page_material,
+            item_template.start_quest,
+            item_template.lock_id,
+            item_template.material,
+            item_template.sheath
         )
 
         return PacketWriter.get_packet(OpCode.SMSG_ITEM_QUERY_SINGLE_RESPONSE, data)
 
     # override
     def get_full_update_packet(self, is_self=True):
+        if self.item_template and self.item_instance:
+            self.sync_fields()
+            return self.get_object_create_packet(is_self)
+
+    def sync_fields(self):
         if self.item_template and self.item_instance:
             from game.world.managers.objects.item.ContainerManager import ContainerManager
 
@@ -334,8 +360,6 @@ class ItemManager(ObjectManager):
             if self.is_container() and isinstance(self, ContainerManager):
                 self.build_container_update_packet()
 
-            return self.get_object_create_packet(is_self)
-
     def set_enchantment(self, slot, value, duration, charges):
         self.enchantments[slot] = (value, duration, charges)
         self.set_int32(ItemFields.ITEM_FIELD_ENCHANTMENT + slot * 3 + 0, value)
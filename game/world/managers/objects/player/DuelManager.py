@@ -1,5 +1,6 @@
 from struct import pack
 from database.world.WorldModels import SpawnsGameobjects
+from game.world.managers.TimerManager import TimerManager
 from game.world.managers.maps.MapManager import MapManager
 from database.world.WorldDatabaseManager import WorldDatabaseManager
 from network.packet.PacketWriter import PacketWriter, OpCode
@@ -22,6 +23,7 @@ class PlayerDuelInformation(object):
 class DuelManager(object):
     ARBITERS_GUID = 4000000  # TODO: Hackfix, We need a way to dynamically generate valid guids for go's
     BOUNDARY_RADIUS = 50
+    BOUNDARY_CHECK_INTERVAL = 1  # Seconds
 
     # Both players will share this DuelManager instance.
     def __init__(self, player1, player2, arbiter):
@@ -30,7 +32,7 @@ class DuelManager(object):
         self.team_ids = {player1.guid: 1, player2.guid: 2}
         self.duel_state = DuelState.DUEL_STATE_FINISHED
         self.arbiter = arbiter
-        self.elapsed = 0  # Used to control 1 update per second based on global tick rate.
+        self.boundary_timer = None
         self.map = player1.map_
 
     @staticmethod
@@ -83,6 +85,7 @@ class DuelManager(object):
             entry.duel_status = DuelStatus.DUEL_STATUS_INBOUNDS
             self.build_update(entry.player)
             entry.player.set_dirty()
+        self.boundary_timer = TimerManager.schedule(DuelManager.BOUNDARY_CHECK_INTERVAL, self.on_boundary_timer)
 
     def force_duel_end(self, player_mgr, retreat=True):
         if player_mgr.guid in self.players:
@@ -128,6 +131,9 @@ class DuelManager(object):
         self.flush()
 
     def flush(self):
+        TimerManager.cancel(self.boundary_timer)
+        self.boundary_timer = None
+
         for duel_info in self.players.values():
             duel_info.player.duel_manager = None
 
@@ -148,7 +154,7 @@ class DuelManager(object):
             dist = self.arbiter.location.distance(entry.player.location)
             if dist >= DuelManager.BOUNDARY_RADIUS:
                 if entry.duel_status == DuelStatus.DUEL_STATUS_OUTOFBOUNDS:
-                    entry.timer -= self.elapsed  # seconds
+                    entry.timer -= DuelManager.BOUNDARY_CHECK_INTERVAL  # seconds
                     if entry.timer <= 0:
                         self.end_duel(DuelWinner.DUEL_WINNER_RETREAT, DuelComplete.DUEL_FINISHED, entry.target)
                         break
@@ -163,18 +169,13 @@ class DuelManager(object):
                     entry.duel_status = DuelStatus.DUEL_STATUS_INBOUNDS
                     entry.player.session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_DUEL_INBOUNDS))
 
-    def update(self, player_mgr, elapsed):
+    def on_boundary_timer(self):
         if not self.players or not self.arbiter or self.duel_state != DuelState.DUEL_STATE_STARTED:
             return
 
-        # Only player who initiated the duel should update the Duel status.
-        if self.players[player_mgr.guid].is_target:
-            return
-
-        self.elapsed += elapsed
-        if self.elapsed >= 1:
-            self.boundary_check()
-            self.elapsed = 0
+        self.boundary_check()
+        if self.duel_state == DuelState.DUEL_STATE_STARTED:
+            self.boundary_timer = TimerManager.schedule(DuelManager.BOUNDARY_CHECK_INTERVAL, self.on_boundary_timer)
 
     def build_update(self, player_mgr):
         arbiter_guid = self.arbiter.guid if self.duel_state == DuelState.DUEL_STATE_STARTED else 0
@@ -184,8 +185,7 @@ class DuelManager(object):
 
     @staticmethod
     def create_arbiter(requester, target, arbiter_entry):
-        go_template, session = WorldDatabaseManager.gameobject_template_get_by_entry(arbiter_entry)
-        session.close()
+        go_template = WorldDatabaseManager.gameobject_template_get_by_entry(arbiter_entry)
 
         if not go_template:
             return None
@@ -215,6 +215,6 @@ class DuelManager(object):
         go_arbiter.faction = requester.faction
 
         go_arbiter.load()
-        go_arbiter.send_update_surrounding()  # spawn arbiter
+        go_arbiter.send_create_surrounding()  # spawn arbiter
 
         return go_arbiter
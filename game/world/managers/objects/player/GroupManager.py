@@ -3,7 +3,9 @@ from struct import pack, unpack
 from database.realm.RealmDatabaseManager import RealmDatabaseManager
 from database.realm.RealmModels import Group, GroupMember
 from game.world.WorldSessionStateHandler import WorldSessionStateHandler
+from game.world.managers.TimerManager import TimerManager
 from utils import Formulas
+from utils.ConfigManager import config
 from network.packet.PacketWriter import PacketWriter, OpCode
 from utils.constants.GroupCodes import PartyOperations, PartyResults
 from utils.constants.ObjectCodes import WhoPartyStatus, LootMethods, PlayerFlags
@@ -16,7 +18,7 @@ MAX_GROUP_SIZE = 5
 
 # TODO: 0.5.3 has no SMSG_LOOT_MASTER_LIST nor CMSG_LOOT_MASTER_GIVE, how exactly they handled ML?
 class GroupManager(object):
-    GROUPS = {}
+    GROUPS = {}  # Only groups with online members (or recently so), loaded on demand.
 
     def __init__(self, group):
         self.group = group
@@ -24,6 +26,7 @@ class GroupManager(object):
         self.invites = {}
         self.allowed_looters = {}
         self._last_looter = None  # For Round Robin, cycle will start at leader.
+        self.eviction_timer = None
 
     def load_group_members(self):
         members = RealmDatabaseManager.group_get_members(self.group)
@@ -337,7 +340,23 @@ class GroupManager(object):
         packet = PacketWriter.get_packet(OpCode.MSG_MINIMAP_PING, data)
         self.send_packet_to_members(packet)
 
+    def has_online_members(self):
+        return any(WorldSessionStateHandler.find_player_by_guid(guid) for guid in self.members)
+
+    # Drops the group from memory if nobody logs back in within the grace period.
+    def schedule_eviction(self):
+        TimerManager.cancel(self.eviction_timer)
+        self.eviction_timer = TimerManager.schedule(config.Server.Settings.guild_group_eviction_seconds,
+                                                    self.on_eviction_timer)
+
+    def on_eviction_timer(self):
+        self.eviction_timer = None
+        if self.group and not self.has_online_members() and \
+                GroupManager.GROUPS.get(self.group.group_id) is self:
+            GroupManager.GROUPS.pop(self.group.group_id)
+
     def flush(self):
+        TimerManager.cancel(self.eviction_timer)
         if self.group.group_id in GroupManager.GROUPS:
             GroupManager.GROUPS.pop(self.group.group_id)
             RealmDatabaseManager.group_destroy(self.group)
@@ -385,10 +404,18 @@ class GroupManager(object):
         GroupManager.GROUPS[raw_group.group_id].load_group_members()
 
     @staticmethod
-    def set_character_group(player_mgr):
-        group_id = RealmDatabaseManager.character_get_group_id(player_mgr.player)
-        if group_id >= 0 and group_id in GroupManager.GROUPS:
-            player_mgr.group_manager = GroupManager.GROUPS[group_id]
+    def set_character_group(player_mgr, group_id):
+        if group_id < 0:
+            return
+        if group_id not in GroupManager.GROUPS:
+            raw_group = RealmDatabaseManager.group_get_by_id(group_id)
+            if not raw_group:
+                return
+            GroupManager.load_group(raw_group)
+        group_manager = GroupManager.GROUPS[group_id]
+        TimerManager.cancel(group_manager.eviction_timer)
+        group_manager.eviction_timer = None
+        player_mgr.group_manager = group_manager
 
     @staticmethod
     def invite_player(player_mgr, target_player_mgr):
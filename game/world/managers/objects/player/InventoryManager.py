@@ -8,6 +8,7 @@ from game.world.managers.objects.item.ContainerManager import ContainerManager
 from network.packet.PacketWriter import PacketWriter, OpCode
 from network.packet.update.UpdatePacketFactory import UpdatePacketFactory
 from utils.Logger import Logger
+from utils.Metrics import Metrics
 from utils.constants.ItemCodes import InventoryTypes, InventorySlots, InventoryError
 from utils.constants.ObjectCodes import BankSlots, ItemBondingTypes
 from utils.constants.UpdateFields import PlayerFields
@@ -25,10 +26,12 @@ class InventoryManager(object):
             InventorySlots.SLOT_BAG3: None,
             InventorySlots.SLOT_BAG4: None
         }
+        # Item guids the owner client already knows.
+        self.known_items = set()
+        # Equipped item guids already broadcast to surrounding players.
+        self.broadcast_equipment = set()
 
-    def load_items(self):
-        character_inventory = RealmDatabaseManager.character_get_inventory(self.owner.guid)
-
+    def load_items(self, character_inventory):
         # First load bags
         for item_instance in character_inventory:
             item_template = WorldDatabaseManager.ItemTemplateHolder.item_template_get_by_entry(item_instance.item_template)
@@ -708,23 +711,69 @@ class InventoryManager(object):
         for slot, item in self.get_backpack().sorted_slots.items():
             self.owner.set_uint64(PlayerFields.PLAYER_FIELD_INV_SLOT_1 + item.current_slot * 2, item.guid)
 
-    def send_single_item_update(self, world_session, item, is_self):
-        update_packet = UpdatePacketFactory.compress_if_needed(PacketWriter.get_packet(
-            OpCode.SMSG_UPDATE_OBJECT, item.get_full_update_packet(is_self=False)))
-        if is_self:
-            world_session.enqueue_packet(update_packet)
-            world_session.enqueue_packet(item.query_details())
-        else:
-            MapManager.send_surrounding(update_packet, world_session.player_mgr, include_self=False)
-            MapManager.send_surrounding(item.query_details(), world_session.player_mgr,
-                                        include_self=False)
-
-    def send_inventory_update(self, world_session, is_self=True):
+    def get_all_items(self):
+        items = {}
         for container_slot, container in list(self.containers.items()):
             if not container:
                 continue
             if not container.is_backpack:
-                self.send_single_item_update(world_session, container, is_self)
-
+                items[container.guid] = container
             for slot, item in list(container.sorted_slots.items()):
-                self.send_single_item_update(world_session, item, is_self)
+                items[item.guid] = item
+        return list(items.values())
+
+    def get_equipped_items(self):
+        return [item for slot, item in list(self.get_backpack().sorted_slots.items())
+                if self.is_equipment_pos(InventorySlots.SLOT_INBACKPACK, slot)]
+
+    # Sends the owner creates for new items and values updates for changed ones, batched.
+    # With force_all every item is created again (e.g. after the client dropped its objects on login or a far
+    # teleport).
+    def send_inventory_update(self, world_session, is_self=True, force_all=False):
+        if is_self:
+            update_packets, query_packets = self._build_items_update(self.get_all_items(), self.known_items,
+                                                                     force_all, send_changes=True)
+            for update_packet in update_packets:
+                world_session.enqueue_packet(update_packet)
+            for query_key, query_packet in query_packets.items():
+                world_session.enqueue_query_response(query_key, query_packet)
+        else:
+            # Only equipment is visible to other players, bag contents are never broadcast.
+            update_packets, query_packets = self._build_items_update(self.get_equipped_items(),
+                                                                     self.broadcast_equipment, force_all)
+            for packet in update_packets + list(query_packets.values()):
+                MapManager.send_surrounding(packet, self.owner, include_self=False)
+
+    # Equipment for a single player that just got the owner in range.
+    def send_equipment_update(self, world_session):
+        update_packets, query_packets = self._build_items_update(self.get_equipped_items(), set(), force_all=True,
+                                                                 track=False)
+        for update_packet in update_packets:
+            world_session.enqueue_packet(update_packet)
+        for query_key, query_packet in query_packets.items():
+            world_session.enqueue_query_response(query_key, query_packet)
+
+    def _build_items_update(self, items, known_guids, force_all=False, send_changes=False, track=True):
+        update_blocks = []
+        query_packets = {}
+        for item in items:
+            item.sync_fields()
+            if force_all or item.guid not in known_guids:
+                update_blocks.append(item.get_object_create_packet(is_self=False))
+                query_packets[('item', item.item_template.entry, item.item_instance.item_flags)] = item.query_details()
+            elif send_changes and item.update_packet_factory.has_pending_updates():
+                update_blocks.append(item.get_partial_update_packet())
+
+            # Only the owner is sent values updates, so only reset when they were consumed.
+            if send_changes:
+                item.reset_fields()
+
+        if track:
+            known_guids.clear()
+            known_guids.update([item.guid for item in items])
+
+        update_packets = UpdatePacketFactory.build_update_object_packets(update_blocks)
+
+        Metrics.increment('inventory.update_blocks', len(update_blocks))
+        Metrics.increment('inventory.packets', len(update_packets) + len(query_packets))
+        return update_packets, query_packets
@@ -1,6 +1,8 @@
 import time
 from struct import unpack
 
+from database.realm.RealmDatabaseManager import RealmDatabaseManager
+from database.realm.RealmModels import Character
 from game.world.WorldSessionStateHandler import WorldSessionStateHandler
 from game.world.managers.maps.MapManager import MapManager
 from game.world.managers.abstractions.Vector import Vector
@@ -17,12 +19,12 @@ from game.world.managers.objects.player.QuestManager import QuestManager
 from game.world.managers.objects.player.FriendsManager import FriendsManager
 from network.packet.PacketWriter import *
 from utils import Formulas
+from utils.TickProfiler import TickProfiler
 from utils.constants.DuelCodes import *
 from utils.constants.ObjectCodes import ObjectTypes, ObjectTypeIds, PlayerFlags, WhoPartyStatus, HighGuid, \
     AttackTypes, MoveFlags
 from utils.constants.SpellCodes import ShapeshiftForms
 from utils.constants.UnitCodes import Classes, PowerTypes, Races, Genders, UnitFlags, Teams
-from network.packet.update.UpdatePacketFactory import UpdatePacketFactory
 from utils.constants.UpdateFields import *
 from database.dbc.DbcDatabaseManager import *
 from utils.constants.ObjectCodes import ChatFlags, LootTypes
@@ -30,6 +32,11 @@ from utils.constants.ObjectCodes import ChatFlags, LootTypes
 
 MAX_ACTION_BUTTONS = 120
 
+# Persisted character columns checked for changes between saves. Played time changes constantly, so it is only
+# written along with other changes or on forced saves (e.g. logout).
+CHARACTER_SAVE_KEYS = [column.key for column in Character.__mapper__.column_attrs
+                       if column.key not in ('totaltime', 'leveltime')]
+
 
 class PlayerManager(UnitManager):
     def __init__(self,
@@ -62,6 +69,7 @@ class PlayerManager(UnitManager):
         self.objects_in_range = dict()
 
         self.player = player
+        self.saved_character_state = None
         self.online = online
         self.num_inv_slots = num_inv_slots
         self.xp = xp
@@ -247,8 +255,13 @@ class PlayerManager(UnitManager):
         if self.group_manager:
             self.group_manager.send_update()
 
+        # The character row is as loaded, only save it once something actually changes.
+        self.mark_saved()
+
     def logout(self):
         self.online = False
+        self.spell_manager.cancel_update_timers()
+        self.aura_manager.cancel_expire_timers()
 
         if self.duel_manager:
             self.duel_manager.force_duel_end(self)
@@ -258,9 +271,17 @@ class PlayerManager(UnitManager):
 
         if self.group_manager:
             self.group_manager.send_update()
+            self.group_manager.schedule_eviction()
+        if self.guild_manager:
+            self.guild_manager.schedule_eviction()
 
         self.friends_manager.send_offline_notification()
-        self.session.save_character()
+        # Saved along with everything else queued for this character, on the realm database workers without waiting
+        # for it. Logging in again flushes this character first.
+        self.sync_player()
+        RealmDatabaseManager.character_queue_update(self.player)
+        self.mark_saved()
+        RealmDatabaseManager.submit(RealmDatabaseManager.flush_character_writes, self.player.guid)
         MapManager.remove_object(self)
         WorldSessionStateHandler.pop_active_player(self)
         self.session.player_mgr = None
@@ -305,28 +326,25 @@ class PlayerManager(UnitManager):
         for guid, player in players.items():
             if self.guid != guid:
                 if guid not in self.objects_in_range:
+                    player.inventory.send_equipment_update(self.session)
                     update_packet = player.generate_proper_update_packet(create=True)
                     self.session.enqueue_packet(update_packet)
-                    self.session.enqueue_packet(NameQueryHandler.get_query_details(player.player))
+                    self.session.enqueue_query_response(('name', guid),
+                                                        NameQueryHandler.get_query_details(player.player))
                 self.objects_in_range[guid] = {'object': player, 'synced': True}
 
         for guid, creature in creatures.items():
             if creature.is_spawned:
                 if guid not in self.objects_in_range:
-                    update_packet = UpdatePacketFactory.compress_if_needed(
-                        PacketWriter.get_packet(OpCode.SMSG_UPDATE_OBJECT,
-                                                creature.get_full_update_packet(is_self=False)))
-                    self.session.enqueue_packet(update_packet)
-                    self.session.enqueue_packet(creature.query_details())
+                    self.session.enqueue_packet(creature.get_cached_create_packet())
+                    self.session.enqueue_query_response(('creature', creature.entry), creature.query_details())
             self.objects_in_range[guid] = {'object': creature, 'synced': True}
 
         for guid, gobject in gobjects.items():
             if guid not in self.objects_in_range:
-                update_packet = UpdatePacketFactory.compress_if_needed(
-                    PacketWriter.get_packet(OpCode.SMSG_UPDATE_OBJECT,
-                                            gobject.get_full_update_packet(is_self=False)))
-                self.session.enqueue_packet(update_packet)
-                self.session.enqueue_packet(gobject.query_details())
+                self.session.enqueue_packet(gobject.get_cached_create_packet())
+                self.session.enqueue_query_response(('gameobject', gobject.entry, gobject.current_display_id),
+                                                    gobject.query_details())
             self.objects_in_range[guid] = {'object': gobject, 'synced': True}
 
         for guid, object_info in list(self.objects_in_range.items()):
@@ -360,6 +378,15 @@ class PlayerManager(UnitManager):
             self.player.money = self.coinage
             self.player.online = self.online
 
+    def get_character_state(self):
+        return tuple(getattr(self.player, key) for key in CHARACTER_SAVE_KEYS)
+
+    def has_unsaved_changes(self):
+        return self.get_character_state() != self.saved_character_state
+
+    def mark_saved(self):
+        self.saved_character_state = self.get_character_state()
+
     # TODO: teleport system needs a complete rework
     def teleport(self, map_, location):
         if not DbcDatabaseManager.map_get_by_id(map_):
@@ -456,6 +483,9 @@ class PlayerManager(UnitManager):
         if self.duel_manager:
             self.duel_manager.force_duel_end(self)
 
+        # Persist the new location on the next saving phase instead of waiting for this character's save slot.
+        WorldSessionStateHandler.queue_save(self)
+
     # TODO Maybe merge all speed changes in one method
     def change_speed(self, speed=0):
         if speed <= 0:
@@ -805,8 +835,10 @@ class PlayerManager(UnitManager):
         if self.duel_manager:
             self.duel_manager.build_update(self)
 
-        # Inventory
-        self.inventory.send_inventory_update(self.session, is_self)
+        # Inventory, the client drops every object it knew on self create so all items are sent again.
+        # Other players get the equipment from send_update_surrounding / update_surrounding_on_me.
+        if is_self:
+            self.inventory.send_inventory_update(self.session, is_self=True, force_all=True)
         self.inventory.build_update()
 
         # Quests
@@ -1130,20 +1162,17 @@ class PlayerManager(UnitManager):
             self.player.leveltime += elapsed
 
             # Regeneration
+            start = TickProfiler.start()
             self.regenerate(now)
+            TickProfiler.record('player.regeneration', self.map_, start)
             # Attack update
+            start = TickProfiler.start()
             self.attack_update(elapsed)
+            TickProfiler.record('player.attack', self.map_, start)
             # Waypoints (mostly flying paths) update
+            start = TickProfiler.start()
             self.movement_manager.update_pending_waypoints(elapsed)
-
-            # SpellManager tick
-            self.spell_manager.update(now)
-            # AuraManager tick
-            self.aura_manager.update(elapsed)
-
-            # Duel tick
-            if self.duel_manager:
-                self.duel_manager.update(self, elapsed)
+            TickProfiler.record('player.waypoints', self.map_, start)
 
             # Release spirit timer
             if not self.is_alive:
@@ -1154,11 +1183,13 @@ class PlayerManager(UnitManager):
         self.last_tick = now
 
         if self.dirty:
+            start = TickProfiler.start()
             self.send_update_self(reset_fields=False)
             self.send_update_surrounding(self.generate_proper_update_packet())
             MapManager.update_object(self)
             self.reset_fields()
             self.set_dirty(is_dirty=False, dirty_inventory=False)
+            TickProfiler.record('player.object_update', self.map_, start)
 
         self.update_lock = False
 
@@ -1176,7 +1207,9 @@ class PlayerManager(UnitManager):
             self.reset_fields()
 
     def send_update_surrounding(self, update_packet, include_self=False, create=False, force_inventory_update=False):
-        if not create and (self.dirty_inventory or force_inventory_update):
+        if create:
+            self.inventory.send_inventory_update(self.session, is_self=False, force_all=True)
+        elif self.dirty_inventory or force_inventory_update:
             self.inventory.send_inventory_update(self.session, is_self=False)
             self.inventory.build_update()
 
@@ -26,9 +26,7 @@ class QuestManager(object):
         self.active_quests = {}
         self.completed_quests = set()
 
-    def load_quests(self):
-        quest_db_statuses = RealmDatabaseManager.character_get_quests(self.player_mgr.guid)
-
+    def load_quests(self, quest_db_statuses):
         for quest_db_status in quest_db_statuses:
             if quest_db_status.rewarded > 0:
                 self.completed_quests.add(quest_db_status.quest)
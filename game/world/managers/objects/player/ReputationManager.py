@@ -15,8 +15,7 @@ class ReputationManager(object):
         self.player_mgr = player_mgr
         self.reputations = {}
 
-    def load_reputations(self):
-        reputations = RealmDatabaseManager.character_get_reputations(self.player_mgr.player.guid)
+    def load_reputations(self, reputations):
         for reputation in reputations:
             self.reputations[reputation.index] = reputation
 
@@ -197,8 +197,8 @@ class SkillManager(object):
         self.skills = {}
         self.proficiencies = {}
 
-    def load_skills(self):
-        for skill in RealmDatabaseManager.character_get_skills(self.player_mgr.guid):
+    def load_skills(self, skills):
+        for skill in skills:
             self.skills[skill.skill] = skill
         self.build_update()
 
@@ -1,24 +1,27 @@
 from struct import pack
 from datetime import datetime
 from database.realm.RealmDatabaseManager import RealmDatabaseManager, Guild, GuildMember
+from game.world.managers.TimerManager import TimerManager
 from game.world.WorldSessionStateHandler import WorldSessionStateHandler
 from game.world.managers.maps.MapManager import MapManager
 from network.packet.PacketWriter import PacketWriter, OpCode
 from utils.constants.ObjectCodes import GuildRank, GuildCommandResults, GuildTypeCommand, GuildEvents, \
     GuildChatMessageTypes, GuildEmblemResult
 from game.world.managers.objects.player.guild.GuildPendingInvite import GuildPendingInvite
+from utils.ConfigManager import config
 from utils.TextUtils import TextChecker
 from utils.constants.UpdateFields import PlayerFields
 
 
 class GuildManager(object):
-    GUILDS = {}  # Check for name duplicity upon creation.
+    GUILDS = {}  # Only guilds with online members (or recently so), loaded on demand.
     PENDING_INVITES = {}
 
     def __init__(self, guild):
         self.guild = guild
         self.members = {}
         self.guild_master = None
+        self.eviction_timer = None
         GuildManager.GUILDS[self.guild.name] = self
 
     def load_guild_members(self):
@@ -187,9 +190,24 @@ class GuildManager(object):
                 player_mgr.set_dirty()
 
         GuildManager.GUILDS.pop(self.guild.name)
+        TimerManager.cancel(self.eviction_timer)
         self.members.clear()
         RealmDatabaseManager.guild_destroy(self.guild)
 
+    def has_online_members(self):
+        return any(WorldSessionStateHandler.find_player_by_guid(guid) for guid in self.members)
+
+    # Drops the guild from memory if nobody logs back in within the grace period.
+    def schedule_eviction(self):
+        TimerManager.cancel(self.eviction_timer)
+        self.eviction_timer = TimerManager.schedule(config.Server.Settings.guild_group_eviction_seconds,
+                                                    self.on_eviction_timer)
+
+    def on_eviction_timer(self):
+        self.eviction_timer = None
+        if not self.has_online_members() and GuildManager.GUILDS.get(self.guild.name) is self:
+            GuildManager.GUILDS.pop(self.guild.name)
+
     def send_message_to_guild(self, packet, msg_type=None, source=None, exclude=None):
         for member in self.members.values():
             if exclude and member.guid == exclude.guid:
@@ -350,8 +368,28 @@ class GuildManager(object):
 
     @staticmethod
     def load_guild(raw_guild):
-        GuildManager.GUILDS[raw_guild.name] = GuildManager(raw_guild)
-        GuildManager.GUILDS[raw_guild.name].load_guild_members()
+        guild_manager = GuildManager(raw_guild)
+        guild_manager.load_guild_members()
+        return guild_manager
+
+    # Loaded guild, loading it if needed, or None if there's no such guild.
+    @staticmethod
+    def get_guild_by_id(guild_id):
+        for guild_manager in GuildManager.GUILDS.values():
+            if guild_manager.guild.guild_id == guild_id:
+                return guild_manager
+
+        raw_guild = RealmDatabaseManager.guild_get_by_id(guild_id)
+        if not raw_guild:
+            return None
+        guild_manager = GuildManager.load_guild(raw_guild)
+        # Nobody might be online to keep it around.
+        guild_manager.schedule_eviction()
+        return guild_manager
+
+    @staticmethod
+    def guild_name_exists(guild_name):
+        return guild_name in GuildManager.GUILDS or RealmDatabaseManager.guild_get_by_name(guild_name) is not None
 
     @staticmethod
     def create_guild(player_mgr, guild_name, petition=None):
@@ -359,7 +397,7 @@ class GuildManager(object):
             GuildManager.send_guild_command_result(player_mgr, GuildTypeCommand.GUILD_CREATE_S, '',
                                                    GuildCommandResults.GUILD_NAME_INVALID)
             return False
-        if guild_name in GuildManager.GUILDS or not petition and RealmDatabaseManager.guild_petition_get_by_name(guild_name):
+        if GuildManager.guild_name_exists(guild_name) or not petition and RealmDatabaseManager.guild_petition_get_by_name(guild_name):
             GuildManager.send_guild_command_result(player_mgr, GuildTypeCommand.GUILD_CREATE_S, guild_name,
                                                    GuildCommandResults.GUILD_NAME_EXISTS)
             return False
@@ -385,10 +423,15 @@ class GuildManager(object):
         return True
 
     @staticmethod
-    def set_character_guild(player_mgr):
-        guild = RealmDatabaseManager.character_get_guild(player_mgr.player)
-        if guild and guild.name in GuildManager.GUILDS:
-            player_mgr.guild_manager = GuildManager.GUILDS[guild.name]
+    def set_character_guild(player_mgr, guild):
+        if not guild:
+            return
+        guild_manager = GuildManager.GUILDS.get(guild.name)
+        if not guild_manager:
+            guild_manager = GuildManager.load_guild(guild)
+        TimerManager.cancel(guild_manager.eviction_timer)
+        guild_manager.eviction_timer = None
+        player_mgr.guild_manager = guild_manager
 
     @staticmethod
     def _create_guild(motd, name, bg_color, b_color, b_style, e_color, e_style, leader_guid):
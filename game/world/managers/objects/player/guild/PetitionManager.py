@@ -23,8 +23,7 @@ class PetitionManager(object):
         return petition
 
     @staticmethod
-    def load_petition(player_mgr):
-        petition = RealmDatabaseManager.guild_petition_get_by_owner(player_mgr.guid)
+    def load_petition(player_mgr, petition):
         if petition:
             petition_item = player_mgr.inventory.get_first_item_by_entry(PetitionManager.CHARTER_ENTRY)
             if petition_item:
@@ -1,6 +1,7 @@
 from struct import pack
 
 from database.world.WorldDatabaseManager import config
+from game.world.managers.TimerManager import TimerManager
 from network.packet.PacketWriter import PacketWriter, OpCode
 from utils.Logger import Logger
 from utils.constants.ObjectCodes import ObjectTypes, Factions
@@ -24,6 +25,7 @@ class AppliedAura:
         self.passive = casting_spell.is_passive() or spell_effect.effect_index != 1
 
         self.index = -1  # Set on application
+        self.expire_timer = None
 
     def has_duration(self):
         return self.duration != -1
@@ -126,15 +128,18 @@ class AuraManager:
         self.write_aura_flag_to_unit(aura)
         self.send_aura_duration(aura)
 
+        if aura.has_duration():
+            aura.expire_timer = TimerManager.schedule(aura.duration / 1000, lambda: self.expire_aura(aura))
+
         self.unit_mgr.set_dirty()
 
-    def update(self, elapsed):
-        for aura in list(self.active_auras.values()):
-            if not aura.has_duration():
-                continue
-            aura.duration -= int(elapsed*1000)
-            if aura.duration <= 0:
-                self.remove_aura(aura)
+    def expire_aura(self, aura):
+        if self.active_auras.get(aura.index) is aura:
+            self.remove_aura(aura)
+
+    def cancel_expire_timers(self):
+        for aura in self.active_auras.values():
+            TimerManager.cancel(aura.expire_timer)
 
     def can_apply_aura(self, aura):
         if aura.spell_effect.aura_type == AuraTypes.SPELL_AURA_MOD_SHAPESHIFT and \
@@ -190,6 +195,7 @@ class AuraManager:
     def remove_aura(self, aura):
         # TODO check if aura can be removed (by player)
         AuraEffectHandler.handle_aura_effect_change(aura, True)
+        TimerManager.cancel(aura.expire_timer)
         self.active_auras.pop(aura.index)
         if aura.passive:
             return  # Passive auras aren't written to unit
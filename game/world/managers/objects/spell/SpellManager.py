@@ -4,6 +4,7 @@ from struct import pack
 from database.dbc.DbcDatabaseManager import DbcDatabaseManager
 from database.realm.RealmDatabaseManager import RealmDatabaseManager, CharacterSpell
 from database.world.WorldDatabaseManager import WorldDatabaseManager
+from game.world.managers.TimerManager import TimerManager
 from game.world.managers.maps.MapManager import MapManager
 from game.world.managers.objects.spell.CastingSpell import CastingSpell
 from game.world.managers.objects.spell.SpellEffectHandler import SpellEffectHandler
@@ -21,9 +22,10 @@ class SpellManager(object):
         self.spells = {}
         self.cooldowns = {}
         self.casting_spells = []
+        self.update_timers = set()
 
-    def load_spells(self):
-        for spell in RealmDatabaseManager.character_get_spells(self.unit_mgr.guid):
+    def load_spells(self, spells):
+        for spell in spells:
             self.spells[spell.spell] = spell
 
     def learn_spell(self, spell_id):
@@ -83,6 +85,7 @@ class SpellManager(object):
 
         if not casting_spell.is_instant_cast():
             self.send_cast_start(casting_spell)
+            self.schedule_update(casting_spell.cast_end_timestamp)
             return
 
         # Spell is instant, perform cast
@@ -106,6 +109,7 @@ class SpellManager(object):
         if travel_time != 0:
             casting_spell.cast_state = SpellState.SPELL_STATE_DELAYED
             casting_spell.spell_delay_end_timestamp = time.time() + travel_time
+            self.schedule_update(casting_spell.spell_delay_end_timestamp)
             self.consume_resources_for_cast(casting_spell)  # Remove resources
             return
 
@@ -164,6 +168,23 @@ class SpellManager(object):
         if len(self.casting_spells) == 0:
             return
         self.has_moved = True
+        self.update(time.time())
+
+    # Casts are only updated when one of them is due or the caster moved.
+    def schedule_update(self, timestamp):
+        timer = None
+
+        def on_timer():
+            self.update_timers.discard(timer)
+            self.update(time.time())
+
+        timer = TimerManager.schedule(timestamp - time.time(), on_timer)
+        self.update_timers.add(timer)
+
+    def cancel_update_timers(self):
+        for timer in self.update_timers:
+            TimerManager.cancel(timer)
+        self.update_timers.clear()
 
     def update(self, timestamp):
         moved = self.has_moved
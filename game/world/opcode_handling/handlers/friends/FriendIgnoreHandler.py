@@ -14,9 +14,9 @@ class FriendIgnoreHandler(object):
         offline_player = None
         friend_result_error = None
 
-        # Try to pull the character from DB.
+        # Try to find an offline character by name.
         if not online_player:
-            offline_player = RealmDatabaseManager.character_get_by_name(target_name)
+            offline_player = RealmDatabaseManager.CharacterNameHolder.get_by_name(target_name)
 
         target_guid = online_player.guid if online_player else offline_player.guid if offline_player else None
 
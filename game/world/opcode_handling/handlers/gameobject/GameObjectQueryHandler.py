@@ -13,14 +13,20 @@ class GameObjectQueryHandler(object):
             entry, guid = unpack('<IQ', reader.data[:12])
             if guid > 0:
                 gobject_mgr = MapManager.get_surrounding_gameobject_by_guid(world_session.player_mgr, guid)
-                if not gobject_mgr:
-                    gobject_spawn, session = WorldDatabaseManager.gameobject_spawn_get_by_guid(guid)
-                    if gobject_spawn and gobject_spawn.gameobject.entry == entry:
-                        gobject_mgr = GameObjectManager(
-                            gobject_template=gobject_spawn.gameobject
-                        )
-                    session.close()
                 if gobject_mgr:
                     world_session.enqueue_packet(gobject_mgr.query_details())
+                else:
+                    # Out of range, looked up on the world database workers without holding the world loop.
+                    world_session.defer(
+                        WorldDatabaseManager.submit(WorldDatabaseManager.gameobject_spawn_get_by_guid, guid),
+                        lambda gobject_spawn: GameObjectQueryHandler.send_spawn_details(world_session, entry,
+                                                                                        gobject_spawn))
 
         return 0
+
+    @staticmethod
+    def send_spawn_details(world_session, entry, gobject_spawn):
+        if gobject_spawn and gobject_spawn.gameobject.entry == entry:
+            world_session.enqueue_packet(GameObjectManager.get_query_details_packet(
+                gobject_spawn.gameobject, gobject_spawn.gameobject.display_id))
+        return 0
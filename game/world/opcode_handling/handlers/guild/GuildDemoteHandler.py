@@ -11,7 +11,7 @@ class GuildDemoteHandler(object):
     def handle(world_session, socket, reader):
         if len(reader.data) > 1:  # Avoid handling empty Guild Demote packet.
             target_name = PacketReader.read_string(reader.data, 0).strip()
-            target_player_mgr = RealmDatabaseManager.character_get_by_name(target_name)
+            target_player_mgr = RealmDatabaseManager.CharacterNameHolder.get_by_name(target_name)
             player_mgr = world_session.player_mgr
 
             if not player_mgr.guild_manager:
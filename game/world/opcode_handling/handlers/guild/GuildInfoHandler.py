@@ -14,17 +14,28 @@ class GuildInfoHandler(object):
             GuildManager.send_guild_command_result(player, GuildTypeCommand.GUILD_CREATE_S, '',
                                                    GuildCommandResults.GUILD_PLAYER_NOT_IN_GUILD)
         else:
-            # Guild name
-            name_bytes = PacketWriter.string_to_bytes(player.guild_manager.guild.name)
-            data = pack(
-                f'<{len(name_bytes)}s',
-                name_bytes
-            )
-
-            accounts = RealmDatabaseManager.guild_get_accounts(guild_id=player.guild_manager.guild.guild_id)
-            # TODO: Parse DB DT.
-            # Day, Month, Years, Players, Nº Accounts
-            data += pack('<5I', 0, 0, 0, len(player.guild_manager.members), len(accounts))
-            player.session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_GUILD_INFO, data))
+            # Accounts are queried on the realm database workers, the packet is built on the world loop.
+            world_session.defer(RealmDatabaseManager.submit(RealmDatabaseManager.guild_get_accounts,
+                                                            player.guild_manager.guild.guild_id),
+                                lambda accounts: GuildInfoHandler.send_info(world_session, accounts))
 
         return 0
+
+    @staticmethod
+    def send_info(world_session, accounts):
+        player = world_session.player_mgr
+        if not player or not player.guild_manager:
+            return 0
+
+        # Guild name
+        name_bytes = PacketWriter.string_to_bytes(player.guild_manager.guild.name)
+        data = pack(
+            f'<{len(name_bytes)}s',
+            name_bytes
+        )
+
+        # TODO: Parse DB DT.
+        # Day, Month, Years, Players, Nº Accounts
+        data += pack('<5I', 0, 0, 0, len(player.guild_manager.members), len(accounts))
+        player.session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_GUILD_INFO, data))
+        return 0
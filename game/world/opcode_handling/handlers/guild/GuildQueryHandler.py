@@ -11,11 +11,11 @@ class GuildQueryHandler(object):
             guild_id = unpack('<1I', reader.data[:4])[0]
             player = world_session.player_mgr
 
-            for guild_manager in GuildManager.GUILDS.values():
-                if guild_manager.guild.guild_id == guild_id:
-                    if player and player.session:
-                        player.session.enqueue_packet(guild_manager.build_guild_query())
-                    else:  # This opcode is requested by char enum if there is no guild cache on client.
-                        world_session.enqueue_packet(guild_manager.build_guild_query())
+            guild_manager = GuildManager.get_guild_by_id(guild_id)
+            if guild_manager:
+                if player and player.session:
+                    player.session.enqueue_packet(guild_manager.build_guild_query())
+                else:  # This opcode is requested by char enum if there is no guild cache on client.
+                    world_session.enqueue_packet(guild_manager.build_guild_query())
 
         return 0
@@ -14,25 +14,36 @@ class GuildRosterHandler(object):
             GuildManager.send_guild_command_result(player, GuildTypeCommand.GUILD_CREATE_S, '',
                                                    GuildCommandResults.GUILD_PLAYER_NOT_IN_GUILD)
         else:
-            guild_name = PacketWriter.string_to_bytes(player.guild_manager.guild.name)
-            data = pack(
-                f'<{len(guild_name)}s',
-                guild_name
-            )
-
-            # Members count
-            data += pack('<I', len(player.guild_manager.members))
-            accounts = RealmDatabaseManager.guild_get_accounts(guild_id=player.guild_manager.guild.guild_id)
-            data += pack('<I', len(accounts))
+            # Accounts are queried on the realm database workers, the roster is built on the world loop.
+            world_session.defer(RealmDatabaseManager.submit(RealmDatabaseManager.guild_get_accounts,
+                                                            player.guild_manager.guild.guild_id),
+                                lambda accounts: GuildRosterHandler.send_roster(world_session, accounts))
 
-            for member in player.guild_manager.members.values():
-                player_name = PacketWriter.string_to_bytes(member.character.name)
-                data += pack(
-                    f'<{len(player_name)}sI',
-                    player_name,
-                    member.rank
-                )
+        return 0
 
-            player.session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_GUILD_ROSTER, data))
+    @staticmethod
+    def send_roster(world_session, accounts):
+        player = world_session.player_mgr
+        if not player or not player.guild_manager:
+            return 0
+
+        guild_name = PacketWriter.string_to_bytes(player.guild_manager.guild.name)
+        data = pack(
+            f'<{len(guild_name)}s',
+            guild_name
+        )
+
+        # Members count
+        data += pack('<I', len(player.guild_manager.members))
+        data += pack('<I', len(accounts))
+
+        for member in player.guild_manager.members.values():
+            player_name = PacketWriter.string_to_bytes(member.character.name)
+            data += pack(
+                f'<{len(player_name)}sI',
+                player_name,
+                member.rank
+            )
 
+        player.session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_GUILD_ROSTER, data))
         return 0
@@ -1,3 +1,4 @@
+from database.DatabaseWorkerPool import gather
 from database.dbc.DbcDatabaseManager import DbcDatabaseManager
 from game.world.managers.objects.item.ItemManager import ItemManager
 from game.world.managers.objects.player.ReputationManager import ReputationManager
@@ -49,56 +50,82 @@ class CharCreateHandler(object):
         if not TextUtils.TextChecker.valid_text(name, is_name=True):
             result = CharCreate.CHAR_CREATE_ERROR
 
-        if result == CharCreate.CHAR_CREATE_SUCCESS:
-            map_, zone, x, y, z, o = CharCreateHandler.get_starting_location(race, class_)
-            base_stats = WorldDatabaseManager.player_get_class_level_stats(class_,
-                                                                           config.Unit.Player.Defaults.starting_level)
-            character = Character(account_id=world_session.account_mgr.account.id,
-                                  name=name,
-                                  race=race,
-                                  class_=class_,
-                                  gender=gender,
-                                  skin=skin,
-                                  face=face,
-                                  hairstyle=hairstyle,
-                                  haircolour=haircolor,
-                                  facialhair=facialhair,
-                                  map=map_,
-                                  zone=zone,
-                                  position_x=x,
-                                  position_y=y,
-                                  position_z=z,
-                                  orientation=o,
-                                  health=base_stats.basehp,
-                                  power1=base_stats.basemana,
-                                  power2=0,
-                                  power3=100 if class_ == Classes.CLASS_HUNTER else 0,
-                                  power4=100 if class_ == Classes.CLASS_ROGUE else 0,
-                                  level=config.Unit.Player.Defaults.starting_level)
-            RealmDatabaseManager.character_create(character)
-            CharCreateHandler.generate_starting_reputations(character.guid)
-            CharCreateHandler.generate_starting_spells(character.guid, race, class_, character.level)
-            CharCreateHandler.generate_starting_items(character.guid, race, class_, gender)
-            default_deathbind = CharacterDeathbind(
-                player_guid=character.guid,
-                creature_binder_guid=0,
-                deathbind_map=map_,
-                deathbind_zone=zone,
-                deathbind_position_x=x,
-                deathbind_position_y=y,
-                deathbind_position_z=z
-            )
-            RealmDatabaseManager.character_add_deathbind(default_deathbind)
+        if result != CharCreate.CHAR_CREATE_SUCCESS:
+            return CharCreateHandler.send_result(world_session, result)
 
-        data = pack('<B', result)
-        world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_CHAR_CREATE, data))
+        # Queries run on the database workers, the character is built and the caches updated on the world loop.
+        world_session.defer(gather({
+            'create_info': WorldDatabaseManager.submit(WorldDatabaseManager.player_create_info_get, race, class_),
+            'base_stats': WorldDatabaseManager.submit(WorldDatabaseManager.player_get_class_level_stats, class_,
+                                                      config.Unit.Player.Defaults.starting_level),
+            'create_spells': WorldDatabaseManager.submit(WorldDatabaseManager.player_create_spell_get, race, class_)
+        }), lambda create_data: CharCreateHandler.create_character(
+            world_session, name, race, class_, gender, skin, face, hairstyle, haircolor, facialhair, create_data))
+
+        return 0
+
+    @staticmethod
+    def create_character(world_session, name, race, class_, gender, skin, face, hairstyle, haircolor, facialhair,
+                         create_data):
+        info = create_data['create_info']
+        base_stats = create_data['base_stats']
+        character = Character(guid=CHARACTER_GUIDS.allocate(),
+                              account_id=world_session.account_mgr.account.id,
+                              name=name,
+                              race=race,
+                              class_=class_,
+                              gender=gender,
+                              skin=skin,
+                              face=face,
+                              hairstyle=hairstyle,
+                              haircolour=haircolor,
+                              facialhair=facialhair,
+                              map=info.map,
+                              zone=info.zone,
+                              position_x=info.position_x,
+                              position_y=info.position_y,
+                              position_z=info.position_z,
+                              orientation=info.orientation,
+                              health=base_stats.basehp,
+                              power1=base_stats.basemana,
+                              power2=0,
+                              power3=100 if class_ == Classes.CLASS_HUNTER else 0,
+                              power4=100 if class_ == Classes.CLASS_ROGUE else 0,
+                              level=config.Unit.Player.Defaults.starting_level)
+        world_session.defer(RealmDatabaseManager.submit(RealmDatabaseManager.character_create, character),
+                            lambda created: CharCreateHandler.add_starting_data(
+                                world_session, created, create_data['create_spells']))
+        return 0
 
+    @staticmethod
+    def add_starting_data(world_session, character, create_spells):
+        RealmDatabaseManager.CharacterNameHolder.add_character(character)
+        CharCreateHandler.generate_starting_reputations(character.guid)
+        CharCreateHandler.generate_starting_spells(character.guid, character.level, create_spells)
+        CharCreateHandler.generate_starting_items(character.guid, character.race, character.class_,
+                                                  character.gender)
+        default_deathbind = CharacterDeathbind(
+            player_guid=character.guid,
+            creature_binder_guid=0,
+            deathbind_map=character.map,
+            deathbind_zone=character.zone,
+            deathbind_position_x=character.position_x,
+            deathbind_position_y=character.position_y,
+            deathbind_position_z=character.position_z
+        )
+        RealmDatabaseManager.character_add_deathbind(default_deathbind)
+        # Starting items, spells, skills and reputations are written behind, make sure they are in the database
+        # before the client asks for the character list.
+        world_session.defer(RealmDatabaseManager.submit(RealmDatabaseManager.flush_character_writes, character.guid),
+                            lambda flushed: CharCreateHandler.send_result(world_session,
+                                                                          CharCreate.CHAR_CREATE_SUCCESS))
         return 0
 
     @staticmethod
-    def get_starting_location(race, class_):
-        info = WorldDatabaseManager.player_create_info_get(race, class_)
-        return info.map, info.zone, info.position_x, info.position_y, info.position_z, info.orientation
+    def send_result(world_session, result):
+        data = pack('<B', result)
+        world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_CHAR_CREATE, data))
+        return 0
 
     @staticmethod
     def generate_starting_reputations(guid):
@@ -115,7 +142,7 @@ class CharCreateHandler(object):
                 RealmDatabaseManager.character_add_reputation(reputation_entry)
 
     @staticmethod
-    def generate_starting_spells(guid, race, class_, level):
+    def generate_starting_spells(guid, level, create_spells):
         added_skills = []
         added_spells = []
 
@@ -144,7 +171,7 @@ class CharCreateHandler(object):
             RealmDatabaseManager.character_add_skill(skill_to_set)
             added_skills.append(skill_id_to_insert)
 
-        for spell in WorldDatabaseManager.player_create_spell_get(race, class_):
+        for spell in create_spells:
             spell_to_load = DbcDatabaseManager.SpellHolder.spell_get_by_id(spell.Spell)
             if spell_to_load:
                 if spell_to_load.ID not in added_spells:
@@ -2,6 +2,7 @@ from struct import pack, unpack
 
 from network.packet.PacketWriter import *
 from database.realm.RealmDatabaseManager import *
+from game.world.opcode_handling.handlers.player.NameQueryHandler import NameQueryHandler
 from utils.Logger import Logger
 from utils.constants.CharCodes import *
 
@@ -14,10 +15,23 @@ class CharDeleteHandler(object):
         if len(reader.data) >= 8:  # Avoid handling empty area char delete packet.
             guid = unpack('<Q', reader.data[:8])[0]
 
+        if guid == 0:
+            return CharDeleteHandler.send_result(world_session, guid, -1)
+
+        # Deleted on the realm database workers, the caches are updated on the world loop.
+        world_session.defer(RealmDatabaseManager.submit(RealmDatabaseManager.character_delete, guid),
+                            lambda deleted: CharDeleteHandler.send_result(world_session, guid, deleted))
+        return 0
+
+    @staticmethod
+    def send_result(world_session, guid, deleted):
         res = CharDelete.CHAR_DELETE_SUCCESS
-        if guid == 0 or RealmDatabaseManager.character_delete(guid) != 0:
+        if deleted != 0:
             res = CharDelete.CHAR_DELETE_FAILED
             Logger.error(f'Error deleting character with guid {guid}.')
+        else:
+            RealmDatabaseManager.CharacterNameHolder.remove_character(guid)
+            NameQueryHandler.invalidate_query_details(guid)
 
         world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_CHAR_DELETE, pack('<B', res)))
 
@@ -1,28 +1,41 @@
 import time
+import traceback
 from struct import pack, unpack
 
 from database.world.WorldDatabaseManager import WorldDatabaseManager
 from network.packet.PacketWriter import *
 from database.realm.RealmDatabaseManager import *
+from utils.Logger import Logger
+from utils.Metrics import Metrics
 
 
 class CharEnumHandler(object):
 
     @staticmethod
     def handle(world_session, socket, reader):
-        characters = RealmDatabaseManager.account_get_characters(world_session.account_mgr.account.id)
-        count = len(characters)
+        # Queried and built on the realm database workers, the packet is queued once ready.
+        RealmDatabaseManager.submit(CharEnumHandler.send_char_enum, world_session, time.perf_counter())
+        return 0
 
-        data = pack('<B', count)
-        for character in characters:
-            data += CharEnumHandler.get_char_packet(world_session, character)
-        world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_CHAR_ENUM, data))
+    @staticmethod
+    def send_char_enum(world_session, start_time):
+        try:
+            characters, items_by_owner, guild_ids = RealmDatabaseManager.account_get_char_enum_data(
+                world_session.account_mgr.account.id)
+            count = len(characters)
 
-        return 0
+            data = pack('<B', count)
+            for character in characters:
+                data += CharEnumHandler.get_char_packet(world_session, character,
+                                                        items_by_owner.get(character.guid, {}),
+                                                        guild_ids.get(character.guid, 0))
+            world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_CHAR_ENUM, data))
+            Metrics.add_sample('char_enum.ms', (time.perf_counter() - start_time) * 1000)
+        except Exception:
+            Logger.error(f'Error sending character list: {traceback.format_exc()}')
 
     @staticmethod
-    def get_char_packet(world_session, character):
-        guild = RealmDatabaseManager.character_get_guild(character)
+    def get_char_packet(world_session, character, equipped_items, guild_id):
         name_bytes = PacketWriter.string_to_bytes(character.name)
         char_fmt = f'<Q{len(name_bytes)}s9B2I3f4I'
         char_packet = pack(
@@ -43,14 +56,14 @@ class CharEnumHandler(object):
             character.position_x,
             character.position_y,
             character.position_z,
-            guild.guild_id if guild else 0,
+            guild_id,
             0,  # TODO: Handle PetDisplayInfo
             0,  # TODO: Handle PetLevel
             0  # TODO: Handle PetFamily,
         )
 
         for slot in range(InventorySlots.SLOT_HEAD, InventorySlots.SLOT_BAG2):
-            item = RealmDatabaseManager.character_get_item_by_slot(character.guid, slot)
+            item = equipped_items.get(slot)
             display_id = 0
             inventory_type = 0
 
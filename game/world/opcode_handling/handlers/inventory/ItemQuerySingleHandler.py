@@ -14,9 +14,6 @@ class ItemQuerySingleHandler(object):
             if entry > 0:
                 item_template = WorldDatabaseManager.ItemTemplateHolder.item_template_get_by_entry(entry)
                 if item_template:
-                    item_mgr = ItemManager(
-                        item_template=item_template
-                    )
-                    world_session.enqueue_packet(item_mgr.query_details())
+                    world_session.enqueue_packet(ItemManager.get_query_details_packet(item_template))
 
         return 0
@@ -11,34 +11,52 @@ class PageTextQueryHandler(object):
     def handle(world_session, socket, reader):
         if len(reader.data) >= 4:  # Avoid handling empty page text query packet.
             page_id = unpack('<I', reader.data[:4])[0]
-            keep_looking = True
-
-            while keep_looking:
-                page = WorldDatabaseManager.page_text_get_by_id(page_id)
-                data = pack('<I', page_id)
-
-                if page:
-                    page_text_bytes = PacketWriter.string_to_bytes(GameTextFormatter.format(world_session.player_mgr,
-                                                                                            page.text))
-                    data += pack(
-                        f'<{len(page_text_bytes)}sI',
-                        page_text_bytes,
-                        page.next_page
-                    )
-                    page_id = page.next_page
-
-                    if page_id <= 0:
-                        keep_looking = False
-                else:
-                    missing_page_bytes = PacketWriter.string_to_bytes('Item page missing.')
-                    data += pack(
-                        f'<{len(missing_page_bytes)}sI',
-                        missing_page_bytes,
-                        0
-                    )
+            # Pages are queried on the world database workers, the responses are built on the world loop.
+            world_session.defer(WorldDatabaseManager.submit(PageTextQueryHandler.get_pages, page_id),
+                                lambda pages: PageTextQueryHandler.send_pages(world_session, pages))
 
+        return 0
+
+    # Returns [(page_id, page)] following next_page, page is None if missing.
+    @staticmethod
+    def get_pages(page_id):
+        pages = []
+        keep_looking = True
+
+        while keep_looking:
+            page = WorldDatabaseManager.page_text_get_by_id(page_id)
+            pages.append((page_id, page))
+
+            if page:
+                page_id = page.next_page
+                if page_id <= 0:
                     keep_looking = False
+            else:
+                keep_looking = False
+
+        return pages
 
-                world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_PAGE_TEXT_QUERY_RESPONSE, data))
+    @staticmethod
+    def send_pages(world_session, pages):
+        for page_id, page in pages:
+            data = pack('<I', page_id)
+
+            if page:
+                page_text_bytes = PacketWriter.string_to_bytes(GameTextFormatter.format(world_session.player_mgr,
+                                                                                        page.text))
+                data += pack(
+                    f'<{len(page_text_bytes)}sI',
+                    page_text_bytes,
+                    page.next_page
+                )
+            else:
+                missing_page_bytes = PacketWriter.string_to_bytes('Item page missing.')
+                data += pack(
+                    f'<{len(missing_page_bytes)}sI',
+                    missing_page_bytes,
+                    0
+                )
+
+            world_session.enqueue_packet(PacketWriter.get_packet(OpCode.SMSG_PAGE_TEXT_QUERY_RESPONSE, data))
 
         return 0
@@ -17,11 +17,10 @@ class BuyItemInSlotHandler(object):
 
                 vendor_npc = MapManager.get_surrounding_unit_by_guid(world_session.player_mgr, vendor_guid)
 
-                vendor_data, session = WorldDatabaseManager.creature_get_vendor_data_by_item(vendor_npc.entry, item)
+                vendor_data = WorldDatabaseManager.creature_get_vendor_data_by_item(vendor_npc.entry, item)
 
                 if vendor_data:
                     item_template = vendor_data.item_template
-                    session.close()
 
                     total_cost = item_template.buy_price * count
 
@@ -13,14 +13,19 @@ class CreatureQueryHandler(object):
             entry, guid = unpack('<IQ', reader.data[:12])
             if guid > 0:
                 creature_mgr = MapManager.get_surrounding_unit_by_guid(world_session.player_mgr, guid)
-                if not creature_mgr:
-                    creature_spawn, session = WorldDatabaseManager.creature_spawn_get_by_guid(guid)
-                    if creature_spawn and creature_spawn.creature_template.entry == entry:
-                        creature_mgr = CreatureManager(
-                            creature_template=creature_spawn.creature_template
-                        )
-                    session.close()
                 if creature_mgr:
                     world_session.enqueue_packet(creature_mgr.query_details())
+                else:
+                    # Out of range, looked up on the world database workers without holding the world loop.
+                    world_session.defer(
+                        WorldDatabaseManager.submit(WorldDatabaseManager.creature_spawn_get_by_guid, guid),
+                        lambda creature_spawn: CreatureQueryHandler.send_spawn_details(world_session, entry,
+                                                                                       creature_spawn))
 
         return 0
+
+    @staticmethod
+    def send_spawn_details(world_session, entry, creature_spawn):
+        if creature_spawn and creature_spawn.creature_template.entry == entry:
+            world_session.enqueue_packet(CreatureManager.get_query_details_packet(creature_spawn.creature_template))
+        return 0
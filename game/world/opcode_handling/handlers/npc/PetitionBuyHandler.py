@@ -23,7 +23,7 @@ class PetitionBuyHandler(object):
                 elif not TextChecker.valid_text(guild_name, is_guild=True):
                     GuildManager.send_guild_command_result(world_session.player_mgr, GuildTypeCommand.GUILD_CREATE_S, '',
                                                            GuildCommandResults.GUILD_NAME_INVALID)
-                elif guild_name in GuildManager.GUILDS or RealmDatabaseManager.guild_petition_get_by_name(guild_name):
+                elif GuildManager.guild_name_exists(guild_name) or RealmDatabaseManager.guild_petition_get_by_name(guild_name):
                     GuildManager.send_guild_command_result(world_session.player_mgr, GuildTypeCommand.GUILD_CREATE_S, guild_name,
                                                            GuildCommandResults.GUILD_NAME_EXISTS)
                 elif world_session.player_mgr.inventory.get_item_count(PetitionManager.CHARTER_ENTRY) > 0:
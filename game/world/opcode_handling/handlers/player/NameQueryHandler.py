@@ -7,6 +7,8 @@ from utils.constants.OpCodes import OpCode
 
 
 class NameQueryHandler(object):
+    # guid: ((name, race, gender, class), packet)
+    QUERY_CACHE = {}
 
     @staticmethod
     def handle(world_session, socket, reader):
@@ -17,22 +19,32 @@ class NameQueryHandler(object):
             if player_mgr:
                 player = player_mgr.player
             else:
-                player = RealmDatabaseManager.character_get_by_guid(guid)
+                player = RealmDatabaseManager.CharacterNameHolder.get_by_guid(guid)
 
             if player:
                 world_session.enqueue_packet(NameQueryHandler.get_query_details(player))
 
         return 0
 
+    # Cached per character, rebuilt if any of the sent values changed.
     @staticmethod
     def get_query_details(player):
-        name_bytes = PacketWriter.string_to_bytes(player.name)
-        player_data = pack(
-            f'<Q{len(name_bytes)}s3I',
-            player.guid,
-            name_bytes,
-            player.race,
-            player.gender,
-            player.class_
-        )
-        return PacketWriter.get_packet(OpCode.SMSG_NAME_QUERY_RESPONSE, player_data)
+        player_details = (player.name, player.race, player.gender, player.class_)
+        cached_details, query_packet = NameQueryHandler.QUERY_CACHE.get(player.guid, (None, None))
+        if cached_details != player_details:
+            name_bytes = PacketWriter.string_to_bytes(player.name)
+            player_data = pack(
+                f'<Q{len(name_bytes)}s3I',
+                player.guid,
+                name_bytes,
+                player.race,
+                player.gender,
+                player.class_
+            )
+            query_packet = PacketWriter.get_packet(OpCode.SMSG_NAME_QUERY_RESPONSE, player_data)
+            NameQueryHandler.QUERY_CACHE[player.guid] = (player_details, query_packet)
+        return query_packet
+
+    @staticmethod
+    def invalidate_query_details(guid):
+        NameQueryHandler.QUERY_CACHE.pop(guid, None)
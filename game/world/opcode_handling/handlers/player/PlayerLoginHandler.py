@@ -11,6 +11,7 @@ from network.packet.PacketWriter import *
 from database.realm.RealmDatabaseManager import *
 from database.dbc.DbcDatabaseManager import *
 from utils.Logger import Logger
+from utils.Metrics import Metrics
 from game.world.managers.objects.player.PlayerManager import PlayerManager
 from utils.ConfigManager import config
 from game.world.managers.objects.player.ChatManager import ChatManager
@@ -26,9 +27,28 @@ class PlayerLoginHandler(object):
             return -1
 
         guid = unpack('<Q', reader.data[:8])[0]
+        start_time = time.perf_counter()
 
-        world_session.player_mgr = PlayerManager(
-            RealmDatabaseManager.character_get_by_guid(guid), world_session)
+        # Character data might still be queued for writing (e.g. just created or relogging), then everything is loaded
+        # on the realm database workers. The world loop carries on with the login once done.
+        world_session.defer(RealmDatabaseManager.submit(RealmDatabaseManager.flush_character_writes, guid),
+                            lambda flushed: PlayerLoginHandler.load(world_session, socket, guid, start_time))
+        return 0
+
+    @staticmethod
+    def load(world_session, socket, guid, start_time):
+        load_start_time = time.perf_counter()
+
+        def on_loaded(login_data):
+            Metrics.add_sample('login.load_ms', (time.perf_counter() - load_start_time) * 1000)
+            return PlayerLoginHandler.login(world_session, socket, guid, login_data, start_time)
+
+        world_session.defer(RealmDatabaseManager.character_get_login_data(guid), on_loaded)
+        return 0
+
+    @staticmethod
+    def login(world_session, socket, guid, login_data, start_time):
+        world_session.player_mgr = PlayerManager(login_data['character'], world_session)
         world_session.player_mgr.session = world_session
         if not world_session.player_mgr.player:
             Logger.anticheat(f'Character with wrong guid ({guid}) tried to login.')
@@ -59,10 +79,10 @@ class PlayerLoginHandler(object):
                                                              PlayerLoginHandler._get_login_timespeed()))
 
         world_session.player_mgr.skill_manager.load_proficiencies()
-        world_session.player_mgr.spell_manager.load_spells()
+        world_session.player_mgr.spell_manager.load_spells(login_data['spells'])
 
-        world_session.player_mgr.deathbind = RealmDatabaseManager.character_get_deathbind(world_session.player_mgr.guid)
-        world_session.player_mgr.friends_manager.load_from_db(RealmDatabaseManager.character_get_social(world_session.player_mgr.guid))
+        world_session.player_mgr.deathbind = login_data['deathbind']
+        world_session.player_mgr.friends_manager.load_from_db(login_data['social'])
 
         world_session.enqueue_packet(world_session.player_mgr.get_deathbind_packet())
         # Tutorials aren't implemented in 0.5.3
@@ -74,15 +94,15 @@ class PlayerLoginHandler(object):
         # MotD
         ChatManager.send_system_message(world_session, config.Server.General.motd)
 
-        world_session.player_mgr.inventory.load_items()
+        world_session.player_mgr.inventory.load_items(login_data['inventory'])
         world_session.player_mgr.stat_manager.init_stats()
         world_session.player_mgr.stat_manager.apply_bonuses()
-        world_session.player_mgr.skill_manager.load_skills()
-        world_session.player_mgr.quest_manager.load_quests()
-        world_session.player_mgr.reputation_manager.load_reputations()
-        GuildManager.set_character_guild(world_session.player_mgr)
-        GroupManager.set_character_group(world_session.player_mgr)
-        PetitionManager.load_petition(world_session.player_mgr)
+        world_session.player_mgr.skill_manager.load_skills(login_data['skills'])
+        world_session.player_mgr.quest_manager.load_quests(login_data['quests'])
+        world_session.player_mgr.reputation_manager.load_reputations(login_data['reputations'])
+        GuildManager.set_character_guild(world_session.player_mgr, login_data['guild'])
+        GroupManager.set_character_group(world_session.player_mgr, login_data['group_id'])
+        PetitionManager.load_petition(world_session.player_mgr, login_data['petition'])
 
         # First login
         if world_session.player_mgr.player.totaltime == 0:
@@ -100,6 +120,7 @@ class PlayerLoginHandler(object):
             PlayerLoginHandler._load_self(world_session.player_mgr)
 
         world_session.player_mgr.complete_login()
+        Metrics.add_sample('login.total_ms', (time.perf_counter() - start_time) * 1000)
 
         return 0
 
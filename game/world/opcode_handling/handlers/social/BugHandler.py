@@ -16,12 +16,14 @@ class BugHandler(object):
             # This packet is even sending the password in plain text, so we don't want that, we only care about the text
             body = full_body[:full_body.index('Username:')].strip()
 
-            RealmDatabaseManager.ticket_add(Ticket(
+            ticket = Ticket(
                 is_bug=is_bug,
                 account_name=world_session.account_mgr.account.name,
                 account_id=world_session.account_mgr.account.id,
                 character_name=world_session.player_mgr.player.name,
                 text_body=body
-            ))
+            )
+            # Stored on the realm database workers, nothing to send back.
+            world_session.defer(RealmDatabaseManager.submit(RealmDatabaseManager.ticket_add, ticket), lambda res: 0)
 
         return 0
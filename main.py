@@ -28,7 +28,7 @@ if __name__ == '__main__':
     # Initialize colorama
     colorama.init()
     # Initialize path
-    PathManager.set_root_path(os.path.realpath(__file__))
+    PathManager.set_root_path(os.path.dirname(os.path.realpath(__file__)))
 
     # if platform != 'win32':
     #    from signal import signal, SIGPIPE, SIG_DFL
@@ -30,5 +30,5 @@ class PacketWriter(object):
             return base_header + pack('<BB', 0, 0) + data
 
     @staticmethod
-    def deflate(data):
-        return zlib.compress(data)
+    def deflate(data, level=zlib.Z_DEFAULT_COMPRESSION):
+        return zlib.compress(data, level)
@@ -20,6 +20,9 @@ class UpdateMask(object):
     def is_set(self, index):
         return self.update_mask[index] != 0
 
+    def any(self):
+        return self.update_mask.any()
+
     def to_bytes(self):
         return self.update_mask.tobytes()
 
@@ -1,20 +1,36 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from struct import pack
 
 from network.packet.update.UpdateMask import UpdateMask
+from utils.ConfigManager import config
+from utils.Metrics import Metrics
 from utils.constants.OpCodes import OpCode
 from network.packet.PacketWriter import PacketWriter
 
+MAX_UPDATE_OBJECT_DATA_SIZE = 0xFFFF - 6
+
 
 class UpdatePacketFactory(object):
+    # zlib releases the GIL, so compression can run in parallel with the world threads.
+    COMPRESSION_POOL = ThreadPoolExecutor(max_workers=config.Server.Settings.compression_workers,
+                                          thread_name_prefix='UpdateCompression')
+
     def __init__(self):
         self.fields_size = 0
         self.update_values = []
+        # Fields changed since the last values update was sent.
         self.update_mask = UpdateMask()
+        # Every field that holds a value, used to build create blocks.
+        self.create_mask = UpdateMask()
+        # Bumped on every field change, used to invalidate cached create blocks.
+        self.version = 0
 
     def init_values(self, fields_size):
         self.fields_size = fields_size
         self.update_values = [0x0] * self.fields_size
         self.update_mask.set_count(self.fields_size)
+        self.create_mask.set_count(self.fields_size)
 
     def reset(self):
         self.update_mask.clear()
@@ -24,14 +40,68 @@ class UpdatePacketFactory(object):
             self.update(index, int(value & 0xFFFFFFFF), 'I')
             self.update(index + 1, int(value >> 32), 'I')
         else:
-            self.update_values[index] = pack(f'<{value_type}', value)
-            self.update_mask.set_bit(index)
+            packed_value = pack(f'<{value_type}', value)
+            # Only flag the field if its value actually changed.
+            if self.update_values[index] != packed_value:
+                self.update_values[index] = packed_value
+                self.update_mask.set_bit(index)
+                self.create_mask.set_bit(index)
+                self.version += 1
 
+    def has_pending_updates(self):
+        return self.update_mask.any()
+
+    # Merges several update blocks into as few SMSG_UPDATE_OBJECT packets as the 16 bits size header allows.
+    @staticmethod
+    def build_update_object_packets(update_blocks):
+        packets = []
+        blocks_data = []
+        data_size = 4
+        for update_block in update_blocks:
+            # Each block starts with its own transaction count, which is replaced by a shared one.
+            block_data = update_block[4:]
+            if blocks_data and data_size + len(block_data) > MAX_UPDATE_OBJECT_DATA_SIZE:
+                packets.append(UpdatePacketFactory._build_update_object_packet(blocks_data))
+                blocks_data = []
+                data_size = 4
+            blocks_data.append(block_data)
+            data_size += len(block_data)
+
+        if blocks_data:
+            packets.append(UpdatePacketFactory._build_update_object_packet(blocks_data))
+        return packets
+
+    @staticmethod
+    def _build_update_object_packet(blocks_data):
+        data = pack('<I', len(blocks_data)) + b''.join(blocks_data)
+        return UpdatePacketFactory.compress_if_needed(PacketWriter.get_packet(OpCode.SMSG_UPDATE_OBJECT, data))
+
+    # Returns the packet as is if it's small enough, otherwise a Future resolving to the compressed packet.
+    # The same Future can be enqueued to any number of sessions, the packet is only compressed once.
     @staticmethod
     def compress_if_needed(update_packet):
-        if len(update_packet) > 100:
-            compressed_packet_data = PacketWriter.deflate(update_packet[6:])
-            compressed_data = pack('<I', len(update_packet) - 6)
-            compressed_data += compressed_packet_data
-            update_packet = PacketWriter.get_packet(OpCode.SMSG_COMPRESSED_UPDATE_OBJECT, compressed_data)
+        if len(update_packet) > config.Server.Settings.compression_threshold:
+            return UpdatePacketFactory.COMPRESSION_POOL.submit(UpdatePacketFactory._compress, update_packet)
         return update_packet
+
+    @staticmethod
+    def _compress(update_packet):
+        start_time = time.perf_counter()
+        compressed_data = pack('<I', len(update_packet) - 6)
+        compressed_data += PacketWriter.deflate(update_packet[6:], config.Server.Settings.compression_level)
+        compressed_packet = PacketWriter.get_packet(OpCode.SMSG_COMPRESSED_UPDATE_OBJECT, compressed_data)
+        elapsed_us = int((time.perf_counter() - start_time) * 1000000)
+
+        # Not worth it, send the raw packet.
+        if len(compressed_packet) >= len(update_packet):
+            compressed_packet = update_packet
+
+        Metrics.increment('compression.packets')
+        Metrics.increment('compression.time_us', elapsed_us)
+        Metrics.increment('compression.bytes_in', len(update_packet))
+        Metrics.increment('compression.bytes_out', len(compressed_packet))
+        Metrics.increment('compression.bytes_saved', len(update_packet) - len(compressed_packet))
+        Metrics.set('compression.ratio_pct',
+                    int(Metrics.get('compression.bytes_out') * 100 / Metrics.get('compression.bytes_in')))
+
+        return compressed_packet
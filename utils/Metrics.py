@@ -0,0 +1,61 @@
+import threading
+from collections import deque
+
+MAX_SAMPLES = 1000
+
+
+class Metrics:
+    COUNTERS = {}
+    SAMPLES = {}
+    LOCK = threading.Lock()
+
+    @staticmethod
+    def increment(name, amount=1):
+        with Metrics.LOCK:
+            Metrics.COUNTERS[name] = Metrics.COUNTERS.get(name, 0) + amount
+
+    @staticmethod
+    def set(name, value):
+        with Metrics.LOCK:
+            Metrics.COUNTERS[name] = value
+
+    @staticmethod
+    def get(name):
+        return Metrics.COUNTERS.get(name, 0)
+
+    @staticmethod
+    def get_counters(prefix=''):
+        with Metrics.LOCK:
+            return {name: value for name, value in sorted(Metrics.COUNTERS.items()) if name.startswith(prefix)}
+
+    # Only the last MAX_SAMPLES values are kept.
+    @staticmethod
+    def add_sample(name, value):
+        with Metrics.LOCK:
+            samples = Metrics.SAMPLES.get(name)
+            if samples is None:
+                samples = deque(maxlen=MAX_SAMPLES)
+                Metrics.SAMPLES[name] = samples
+            samples.append(value)
+
+    @staticmethod
+    def get_percentiles(name, percentiles=(50, 90, 99)):
+        with Metrics.LOCK:
+            samples = sorted(Metrics.SAMPLES.get(name, ()))
+        if not samples:
+            return {}
+        return {percentile: samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+                for percentile in percentiles}
+
+    @staticmethod
+    def get_sample_names(prefix=''):
+        with Metrics.LOCK:
+            return sorted([name for name in Metrics.SAMPLES if name.startswith(prefix)])
+
+    @staticmethod
+    def reset(prefix=''):
+        with Metrics.LOCK:
+            for name in [name for name in Metrics.COUNTERS if name.startswith(prefix)]:
+                del Metrics.COUNTERS[name]
+            for name in [name for name in Metrics.SAMPLES if name.startswith(prefix)]:
+                del Metrics.SAMPLES[name]
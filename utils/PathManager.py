@@ -11,6 +11,10 @@ class PathManager:
     # Maps
     MAPS_RELATIVE_PATH = 'etc/maps/'
 
+    # Cache
+    CACHE_RELATIVE_PATH = 'etc/cache/'
+    WORLD_DATA_SNAPSHOT_FILE_NAME = 'world_data.snapshot'
+
     @staticmethod
     def set_root_path(root_path):
         PathManager.ROOT_PATH = root_path
@@ -30,3 +34,11 @@ class PathManager:
     @staticmethod
     def get_map_file_path(map_file):
         return path.join(PathManager.get_maps_path(), map_file)
+
+    @staticmethod
+    def get_cache_path():
+        return path.join(PathManager.ROOT_PATH, PathManager.CACHE_RELATIVE_PATH)
+
+    @staticmethod
+    def get_world_data_snapshot_file_path():
+        return path.join(PathManager.get_cache_path(), PathManager.WORLD_DATA_SNAPSHOT_FILE_NAME)
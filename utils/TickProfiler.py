@@ -0,0 +1,120 @@
+import heapq
+import threading
+import time
+
+from utils.ConfigManager import config
+
+
+# Samples of a single thread, only ever written by that thread so recording needs no lock.
+class _ThreadSamples:
+    def __init__(self):
+        # (subsystem, map_id): [total seconds, calls]
+        self.totals = {}
+        # subsystem: seconds spent during the tick currently running
+        self.current_tick = {}
+
+
+class TickProfiler:
+    # Off unless enabled in the config or with the .profile command, recording is then a single check.
+    ENABLED = config.Server.Settings.tick_profiler
+    THREAD_LOCAL = threading.local()
+    # Every thread's samples, merged when reporting.
+    THREAD_SAMPLES = []
+    # Min heap of (tick_ms, tick, breakdown), only filled while sampling.
+    SLOWEST_TICKS = []
+    SLOWEST_TICKS_COUNT = 0
+    LOCK = threading.Lock()  # Only taken when a new thread records its first sample and when reporting.
+
+    # Usage: start = TickProfiler.start(), do the work, then TickProfiler.record('subsystem', map_id, start).
+    @staticmethod
+    def start():
+        return time.perf_counter() if TickProfiler.ENABLED else 0
+
+    @staticmethod
+    def record(subsystem, map_id, start):
+        if not start:
+            return
+        elapsed = time.perf_counter() - start
+        samples = TickProfiler._get_thread_samples()
+        key = (subsystem, map_id)
+        entry = samples.totals.get(key)
+        if entry is None:
+            samples.totals[key] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+        if TickProfiler.SLOWEST_TICKS_COUNT:
+            samples.current_tick[subsystem] = samples.current_tick.get(subsystem, 0) + elapsed
+
+    @staticmethod
+    def _get_thread_samples():
+        samples = getattr(TickProfiler.THREAD_LOCAL, 'samples', None)
+        if samples is None:
+            samples = _ThreadSamples()
+            TickProfiler.THREAD_LOCAL.samples = samples
+            with TickProfiler.LOCK:
+                TickProfiler.THREAD_SAMPLES.append(samples)
+        return samples
+
+    @staticmethod
+    def end_tick(tick, tick_ms):
+        if not TickProfiler.SLOWEST_TICKS_COUNT:
+            return
+
+        with TickProfiler.LOCK:
+            breakdown = {}
+            for samples in TickProfiler.THREAD_SAMPLES:
+                current_tick = samples.current_tick
+                samples.current_tick = {}
+                for subsystem, seconds in current_tick.items():
+                    breakdown[subsystem] = breakdown.get(subsystem, 0) + seconds
+            entry = (tick_ms, tick, breakdown)
+            if len(TickProfiler.SLOWEST_TICKS) < TickProfiler.SLOWEST_TICKS_COUNT:
+                heapq.heappush(TickProfiler.SLOWEST_TICKS, entry)
+            elif tick_ms > TickProfiler.SLOWEST_TICKS[0][0]:
+                heapq.heapreplace(TickProfiler.SLOWEST_TICKS, entry)
+
+    @staticmethod
+    def set_enabled(enabled):
+        TickProfiler.ENABLED = enabled
+
+    # Setting count to 0 disables sampling, any other count also enables the profiler.
+    @staticmethod
+    def set_sampling(count):
+        with TickProfiler.LOCK:
+            TickProfiler.SLOWEST_TICKS_COUNT = max(0, count)
+            TickProfiler.SLOWEST_TICKS.clear()
+            for samples in TickProfiler.THREAD_SAMPLES:
+                samples.current_tick = {}
+        if count > 0:
+            TickProfiler.set_enabled(True)
+
+    # Returns [(subsystem, map_id, total_ms, calls)] ordered by total time spent.
+    @staticmethod
+    def get_top(count=10):
+        merged = {}
+        with TickProfiler.LOCK:
+            for samples in TickProfiler.THREAD_SAMPLES:
+                for key, (total, calls) in list(samples.totals.items()):
+                    entry = merged.setdefault(key, [0, 0])
+                    entry[0] += total
+                    entry[1] += calls
+        entries = [(subsystem, map_id, total * 1000, calls) for (subsystem, map_id), (total, calls) in merged.items()]
+        entries.sort(key=lambda entry: entry[2], reverse=True)
+        return entries[:count]
+
+    # Returns [(tick_ms, tick, {subsystem: ms})], slowest first.
+    @staticmethod
+    def get_slowest_ticks():
+        with TickProfiler.LOCK:
+            ticks = sorted(TickProfiler.SLOWEST_TICKS, key=lambda entry: entry[0], reverse=True)
+        return [(tick_ms, tick, {subsystem: seconds * 1000 for subsystem, seconds in breakdown.items()})
+                for tick_ms, tick, breakdown in ticks]
+
+    @staticmethod
+    def reset():
+        with TickProfiler.LOCK:
+            for samples in TickProfiler.THREAD_SAMPLES:
+                samples.totals = {}
+                samples.current_tick = {}
+            TickProfiler.SLOWEST_TICKS.clear()
@@ -0,0 +1,60 @@
+from collections import Counter
+
+# Minimum share of trigrams (over both names) a fuzzy match must have in common with the searched text.
+MIN_FUZZY_SIMILARITY = 0.3
+
+
+# In memory name search. Every name is split in three character chunks, each pointing to the names containing it,
+# so a search only looks at names sharing chunks with the searched text instead of scanning all of them.
+class TrigramIndex(object):
+    def __init__(self):
+        self.names = []  # Lower case names, position is the entry id.
+        self.values = []
+        self.trigrams = {}  # trigram: [entry ids]
+
+    @staticmethod
+    def get_trigrams(text):
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, name, value):
+        if not name:
+            return
+        entry_id = len(self.names)
+        name = name.lower()
+        self.names.append(name)
+        self.values.append(value)
+        for trigram in TrigramIndex.get_trigrams(name):
+            self.trigrams.setdefault(trigram, []).append(entry_id)
+
+    # Returns the values whose name contains the text (case insensitive), closest (shortest) names first. If none
+    # does and fuzzy is set, returns the ones with the most similar names instead, most similar first.
+    def search(self, text, fuzzy=True):
+        text = text.lower()
+        text_trigrams = TrigramIndex.get_trigrams(text)
+        if not text_trigrams:
+            # Too short to use the index.
+            matches = [entry_id for entry_id, name in enumerate(self.names) if text in name]
+            return self._ranked_by_length(matches)
+
+        shared_counts = Counter()
+        for trigram in text_trigrams:
+            shared_counts.update(self.trigrams.get(trigram, ()))
+
+        # Names containing the text have all of its trigrams.
+        matches = [entry_id for entry_id, shared in shared_counts.items()
+                   if shared == len(text_trigrams) and text in self.names[entry_id]]
+        if matches or not fuzzy:
+            return self._ranked_by_length(matches)
+
+        scored_matches = []
+        for entry_id, shared in shared_counts.items():
+            name_trigram_count = len(TrigramIndex.get_trigrams(self.names[entry_id]))
+            similarity = shared / (len(text_trigrams) + name_trigram_count - shared)
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                scored_matches.append((-similarity, entry_id))
+        scored_matches.sort()
+        return [self.values[entry_id] for similarity, entry_id in scored_matches]
+
+    def _ranked_by_length(self, entry_ids):
+        entry_ids.sort(key=lambda entry_id: (len(self.names[entry_id]), entry_id))
+        return [self.values[entry_id] for entry_id in entry_ids]